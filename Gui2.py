@@ -1,68 +1,66 @@
+import time
+startup_time = time.perf_counter()
+import threading
+from datetime import datetime, timezone
 import customtkinter as ctk
-import joblib
-import re
-from nltk.tokenize import word_tokenize
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from nltk.corpus import stopwords
-import nltk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import sqlite3
-
-#Database
-conn = sqlite3.connect('sentimen.db')
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
-
-# Preprocessor
-stemmer_factory = StemmerFactory()
-stemmer = stemmer_factory.create_stemmer()
-stop_words = set(stopwords.words('indonesian'))
-
-# Model
-model = joblib.load(r'Model\best_model.pkl')
-
-# Insert Data
-def insert_data(input_text, cleaned_text, label):
+from analysis import AnalysisServices
+from database import ConnectionPool, get_label_counts, get_label_trend
+
+#Database (reader untuk chart di thread Tk, writer dipakai DBWriter dan result cache)
+pool = ConnectionPool()
+
+# Preprocessor + Model + matplotlib di-load di background (warmup) supaya window langsung tampil
+services = AnalysisServices(pool)
+warmup_error = None
+warmup_done = threading.Event()
+
+def warmup():
+    global warmup_error
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM tweets WHERE full_text = ?", (input_text,))
-        if cursor.fetchone()[0] > 0:
-            print("Error: Data with the same input already exists. Skipping insertion.")
-            return
-        cursor.execute("INSERT INTO tweets (full_text, tweet_clean, label) VALUES (?, ?, ?)", (input_text, cleaned_text, label))
-        conn.commit()
-        print("Data inserted successfully.")
-    except sqlite3.IntegrityError:
-        print("Error: Data with the same input already exists. Skipping insertion.")
+        import importlib
+        # Preload saja (dipakai lagi di create_chart), tidak perlu nama di scope ini
+        importlib.import_module('matplotlib.figure')
+        services.start()
     except Exception as e:
-        print(f"An error occurred during insertion: {e}")
-
-# Clean Data
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-
-    text = re.sub(r"http\S+|www\S+|https\S+", '', text, flags=re.MULTILINE)   # Menghapus URL
-    text = re.sub(r'@\w+', '', text) # Menghapus mention (@username)
-    text = re.sub(r'#\w+', '', text) # Menghapus hashtag (#hashtag)
-    text = re.sub(r'\d+', '', text) # Menghapus angka
-    text = re.sub(r'[^\w\s]', '', text)
-    text = text.lower()
-    words = word_tokenize(text) #Tokenisasi
-    words = [word for word in words if word not in stop_words]
-    words = [stemmer.stem(word) for word in words]
-    return ' '.join(words)
+        warmup_error = e
+    finally:
+        warmup_done.set()
+
+# Mode chart: total semua data, atau tren per hari / per jam yang dibaca dari tabel rollup
+chart_mode = "Total"
+TREND_MODES = {
+    "Daily": ("day", 14, "%d %b", "Sentiment Trend (per day, UTC)"),
+    "Hourly": ("hour", 24, "%d %b %H:00", "Sentiment Trend (per hour, UTC)"),
+}
+
+def set_chart_mode(mode):
+    global chart_mode
+    chart_mode = mode
+    update_chart()
 
 # Update Chart
 def update_chart():
+    if chart_canvas is None:
+        return
     chart_ax.clear()
-    cursor = conn.cursor()
-    cursor.execute("SELECT label, COUNT(*) FROM tweets GROUP BY label")
-    label_counts = cursor.fetchall()
+    if chart_mode in TREND_MODES:
+        draw_trend(*TREND_MODES[chart_mode])
+    else:
+        draw_totals()
 
-    sentiment_data = {label: count for label, count in label_counts}
+    chart_ax.set_facecolor("#f8fafc")
+    chart_fig.patch.set_facecolor("#f8fafc")
+    for spine in chart_ax.spines.values():
+        spine.set_visible(False)
+    
+    chart_ax.grid(axis='y', linestyle='--', alpha=0.3)
+    chart_ax.set_ylim(bottom=0)
+    chart_fig.tight_layout(pad=3.0)
+    chart_canvas.draw()
+
+def draw_totals():
+    with pool.reader() as conn:
+        sentiment_data = get_label_counts(conn)
 
     categories = ["positive", "neutral", "negative"]
     values = [sentiment_data.get(cat, 0) for cat in categories]
@@ -87,41 +85,78 @@ def update_chart():
             fontweight='bold',
             fontfamily='sans-serif'
         )
-    
-    chart_ax.set_facecolor("#f8fafc")
-    chart_fig.patch.set_facecolor("#f8fafc")
-    for spine in chart_ax.spines.values():
-        spine.set_visible(False)
-    
-    chart_ax.grid(axis='y', linestyle='--', alpha=0.3)
-    chart_ax.set_ylim(bottom=0)
-    chart_fig.tight_layout(pad=3.0)
-    chart_canvas.draw()
 
-# Analyze Sentiment
+# Satu garis per label untuk bucket terakhir yang berisi data
+def draw_trend(period, buckets, time_format, title):
+    from matplotlib.ticker import MaxNLocator
+    with pool.reader() as conn:
+        trend = get_label_trend(conn, period, buckets)
+    chart_ax.set_title(title, fontsize=16, color=TEXT_COLOR, pad=20)
+    chart_ax.set_ylabel("Jumlah Sentimen", fontsize=12, color=TEXT_COLOR)
+    if not trend:
+        chart_ax.text(0.5, 0.5, "Belum ada data dengan waktu (created_at)", ha='center', va='center',
+                      color=TEXT_COLOR, fontsize=12, transform=chart_ax.transAxes)
+        return
+
+    positions = range(len(trend))
+    for cat, color in zip(["positive", "neutral", "negative"], [POSITIVE_COLOR, NEUTRAL_COLOR, NEGATIVE_COLOR]):
+        chart_ax.plot(positions, [counts.get(cat, 0) for _, counts in trend], color=color, marker='o',
+                      markersize=4, linewidth=2, label=cat.capitalize())
+
+    labels = [datetime.fromtimestamp(bucket, timezone.utc).strftime(time_format) for bucket, _ in trend]
+    step = max(len(labels) // 8, 1)
+    chart_ax.set_xticks(positions[::step])
+    chart_ax.set_xticklabels(labels[::step], rotation=30, ha='right', fontsize=9, color=TEXT_COLOR)
+    chart_ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    chart_ax.legend(frameon=False, loc='upper left')
+
+# Analyze Sentiment (dikerjakan services.worker, hasil diambil lewat window.after)
+polling = False
+
 def analyze_text():
+    global polling
+    if services.worker is None:
+        return
     text = input_box.get("1.0", "end-1c").strip()
     if not text or text == "Type something here...":
         return
-    prep_text = clean_text(text)
+    services.worker.submit(text)
+    analyze_button.configure(text="Analyzing...")
+    if not polling:
+        polling = True
+        window.after(30, poll_analysis)
+
+def poll_analysis():
+    global polling
+    busy = services.worker.busy()
+    result = services.worker.poll()
+    if result is not None:
+        if result.error is not None:
+            print(f"An error occurred during analysis: {result.error}")
+        else:
+            show_result(result.prediction)
+    if not busy:
+        analyze_button.configure(text="Analyze Sentiment")
+    # Chart di-update setelah insert dari writer ter-commit
+    if busy or (services.writer is not None and services.writer.pending()):
+        window.after(30, poll_analysis)
+    else:
+        polling = False
+        if current_view == "chart":
+            update_chart()
 
-    # Predict sentiment 
-    prediction = model.predict([prep_text])[0]
-    probabilities = model.predict_proba([prep_text])[0]
-    #Input Data ke Database
-    insert_data(text, prep_text, prediction)
+def show_result(result):
+    prediction = result.label
     # Kategori Sentimen
-    categories = ["negative", "neutral", "positive"]
-    colors = [NEGATIVE_COLOR, NEUTRAL_COLOR, POSITIVE_COLOR]
-    emojis = ["😟", "😐", "😊"]
+    colors = {"negative": NEGATIVE_COLOR, "neutral": NEUTRAL_COLOR, "positive": POSITIVE_COLOR}
+    emojis = {"negative": "😟", "neutral": "😐", "positive": "😊"}
 
-    index = categories.index(prediction)
-    color = colors[index]
-    emoji = emojis[index]
+    color = colors.get(prediction, NEUTRAL_COLOR)
+    emoji = emojis.get(prediction, "😶")
 
     # Confidence score
-    neg_conf, neu_conf, pos_conf = [round(p * 100, 2) for p in probabilities]
-    confidence = max(neg_conf, neu_conf, pos_conf)
+    neg_conf, neu_conf, pos_conf = [round(result.probabilities.get(cat, 0.0) * 100, 2) for cat in ("negative", "neutral", "positive")]
+    confidence = round(result.confidence * 100, 2)
     
     # Update UI
     result_emoji.configure(text=emoji)
@@ -320,7 +355,8 @@ input_box.bind("<Key>", on_key_press)
 # Analyze button
 analyze_button = ctk.CTkButton(
     input_frame,
-    text="Analyze Sentiment",
+    text="Warming up...",
+    state="disabled",
     font=ctk.CTkFont(family="Helvetica", size=16, weight="bold"),
     corner_radius=30,
     height=50,
@@ -511,21 +547,67 @@ chart_description = ctk.CTkLabel(
     font=ctk.CTkFont(family="Helvetica", size=14),
     text_color="#64748b"
 )
-chart_description.pack(pady=(0, 20))
+chart_description.pack(pady=(0, 10))
+
+# Pilihan mode chart (total atau tren)
+chart_mode_selector = ctk.CTkSegmentedButton(
+    chart_frame,
+    values=["Total", "Daily", "Hourly"],
+    command=set_chart_mode,
+    font=ctk.CTkFont(family="Helvetica", size=13)
+)
+chart_mode_selector.set("Total")
+chart_mode_selector.pack(pady=(0, 10))
+
+# Matplotlib Figure (dibuat setelah warmup selesai)
+chart_fig = None
+chart_ax = None
+chart_canvas = None
+
+def create_chart():
+    global chart_fig, chart_ax, chart_canvas
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    chart_fig = Figure(figsize=(8, 5), dpi=100)
+    chart_ax = chart_fig.add_subplot(111)
+    chart_canvas = FigureCanvasTkAgg(chart_fig, master=chart_frame)
+    chart_canvas.get_tk_widget().pack(fill="both", expand=True, padx=25, pady=(0, 25))
+
+# Cek warmup dari main loop (widget Tk hanya boleh disentuh dari main thread)
+def check_warmup():
+    if not warmup_done.is_set():
+        window.after(50, check_warmup)
+        return
+    if warmup_error is not None:
+        print(f"Warmup gagal: {warmup_error}")
+        analyze_button.configure(text="Model gagal dimuat")
+        return
+    create_chart()
+    if current_view == "chart":
+        update_chart()
+    analyze_button.configure(text="Analyze Sentiment", state="normal")
+    print(f"[startup] warmup selesai: {time.perf_counter() - startup_time:.2f} s")
 
-# Matplotlib Figure
-chart_fig = plt.Figure(figsize=(8, 5), dpi=100)
-chart_ax = chart_fig.add_subplot(111)
-chart_canvas = FigureCanvasTkAgg(chart_fig, master=chart_frame)
-chart_canvas.get_tk_widget().pack(fill="both", expand=True, padx=25, pady=(0, 25))
+# Time-to-first-paint, lalu mulai warmup
+def on_first_paint(event):
+    window.unbind("<Map>")
+    print(f"[startup] first paint: {time.perf_counter() - startup_time:.2f} s")
+    threading.Thread(target=warmup, daemon=True).start()
+    window.after(50, check_warmup)
 
-# Panggil Chart
-update_chart()
+window.bind("<Map>", on_first_paint)
 
 # Highlight Active Menu
 switch_to_view("analysis")
 
+# Simpan cache stem saat keluar
+def on_closing():
+    services.close()
+    window.destroy()
+
+window.protocol("WM_DELETE_WINDOW", on_closing)
+
 # Run
 if __name__ == "__main__":
     confidence_bar.set(0)
-    window.mainloop()
\ No newline at end of file
+    window.mainloop()
@@ -1,71 +1,82 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import joblib
-import re
-import numpy as np
-from nltk.tokenize import word_tokenize
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from nltk.corpus import stopwords
-import nltk
-import pandas as pd
-import preprocessor as p
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import sys
-import sqlite3
+import threading
+from analysis import AnalysisServices
+from database import ConnectionPool, get_label_counts
 
-conn = sqlite3.connect('sentimen.db')
-nltk.download('punkt')
-nltk.download('stopwords')
+# Database (reader untuk chart di thread Tk, writer dipakai DBWriter dan result cache)
+pool = ConnectionPool()
 
-# Preprocessor
-stemmer_factory = StemmerFactory()
-stemmer = stemmer_factory.create_stemmer()
-stop_words = set(stopwords.words('indonesian'))
+# Preprocessor + Model di-load di background, tombol Analisis aktif setelah selesai
+services = AnalysisServices(pool)
+warmup_error = None
+warmup_done = threading.Event()
 
-# Load Model dan Vectorizer
-model = joblib.load(r'Model\best_model.pkl')
+def warmup():
+    global warmup_error
+    try:
+        services.start()
+    except Exception as e:
+        warmup_error = e
+    finally:
+        warmup_done.set()
+
+def check_warmup():
+    if not warmup_done.is_set():
+        root.after(50, check_warmup)
+    elif warmup_error is not None:
+        messagebox.showerror("Model Error", f"Model gagal dimuat: {warmup_error}")
+    else:
+        analyze_button.config(text="Analisis", state=tk.NORMAL)
 
 
 def on_closing():
     if messagebox.askokcancel("Quit", "Apakah Anda yakin ingin keluar?"):
         plt.close('all')
+        services.close()
         root.destroy()
         sys.exit()
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-
-    text = re.sub(r"http\S+|www\S+|https\S+", '', text, flags=re.MULTILINE)   # Menghapus URL
-    text = re.sub(r'@\w+', '', text) # Menghapus mention (@username)
-    text = re.sub(r'#\w+', '', text) # Menghapus hashtag (#hashtag)
-    text = re.sub(r'\d+', '', text) # Menghapus angka
-    text = re.sub(r'[^\w\s]', '', text) # Menghapus tanda baca kecuali spasi
-    text = text.lower() # Mengubah teks menjadi lowercase
-    words = word_tokenize(text) #Tokenisasi
-    words = [stemmer.stem(word) for word in words if word not in stop_words]
-    return ' '.join(words)
+# Satu loop poll_analysis saja, klik berikutnya saat masih polling tidak menjadwalkan loop baru
+polling = False
 
 def analyze_sentiment():
+    global polling
+    if services.worker is None:
+        return
     input_text = entry.get("1.0", tk.END).strip()
     if input_text:
-        preprocessed_text = clean_text(input_text)
-        prediction = model.predict(preprocessed_text)
-        confidence = max(model.predict_proba(preprocessed_text)) * 100
-
-        insert_data(input_text, preprocessed_text,prediction)
-
-        result_label.config(text=f"Sentimen: {prediction}")
-        confidence_label.config(text=f"Confidence: {confidence:.2f}%")
+        services.worker.submit(input_text)
+        result_label.config(text="Menganalisis...")
+        if not polling:
+            polling = True
+            root.after(30, poll_analysis)
     else:
         messagebox.showwarning("Input Error", "Tolong Masukkan Text")
 
+# Ambil hasil dari worker tanpa memblokir main loop
+def poll_analysis():
+    global polling
+    busy = services.worker.busy()
+    result = services.worker.poll()
+    if result is not None:
+        if result.error is not None:
+            print(f"An error occurred during analysis: {result.error}")
+        else:
+            confidence = result.prediction.confidence * 100
+            result_label.config(text=f"Sentimen: {result.prediction.label}")
+            confidence_label.config(text=f"Confidence: {confidence:.2f}%")
+    if busy:
+        root.after(30, poll_analysis)
+    else:
+        polling = False
+
 def create_chart():
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT label, COUNT(*) FROM tweets GROUP BY label")
-    label_counts = cursor.fetchall()
+    with pool.reader() as conn:
+        label_counts = sorted(get_label_counts(conn).items())
     
     if not label_counts:
         messagebox.showwarning("No Data", "Tidak ada data untuk ditampilkan.")
@@ -84,9 +95,8 @@ def create_chart():
     canvas.draw()
     canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-    # Menghitung total data dari database
-    cursor.execute("SELECT COUNT(*) FROM tweets")
-    total_data = cursor.fetchone()[0]
+    # Total data dari ringkasan label
+    total_data = sum(sizes)
 
     info_text = "Jumlah Data:\n"
     for label, count in label_counts:
@@ -98,21 +108,6 @@ def create_chart():
     info_label.configure(font=('Helvetica', 12))
     info_label.pack(fill=tk.X)
 
-def insert_data(input_text, cleaned_text, label):
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM tweets WHERE full_text = ?", (input_text,))
-        if cursor.fetchone()[0] > 0:
-            print("Error: Data with the same input already exists. Skipping insertion.")
-            return
-        cursor.execute("INSERT INTO tweets (full_text, tweet_clean, label) VALUES (?, ?, ?)", (input_text, cleaned_text, label))
-        conn.commit()
-        print("Data inserted successfully.")
-    except sqlite3.IntegrityError:
-        print("Error: Data with the same input already exists. Skipping insertion.")
-    except Exception as e:
-        print(f"An error occurred during insertion: {e}")
-
 # Main Window
 root = tk.Tk()
 root.title("Analisis Sentimen")
@@ -157,8 +152,8 @@ entry = tk.Text(input_frame, height=10, width=50, font=('Helvetica', 12),
 entry.configure(bg="#ffffff", fg="#333333")
 entry.pack(fill='x', pady=10)
 
-analyze_button = ttk.Button(analyze_frame, text="Analisis", command=analyze_sentiment,
-                            style="TButton")
+analyze_button = ttk.Button(analyze_frame, text="Memuat model...", command=analyze_sentiment,
+                            style="TButton", state=tk.DISABLED)
 analyze_button.pack(pady=15)
 
 # Result Frame
@@ -183,4 +178,7 @@ create_chart()
 # Add closing protocol
 root.protocol("WM_DELETE_WINDOW", on_closing)
 
+threading.Thread(target=warmup, daemon=True).start()
+root.after(50, check_warmup)
+
 root.mainloop()
\ No newline at end of file
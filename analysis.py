@@ -0,0 +1,143 @@
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from database import DB_PATH, connect, insert_data
+
+# Hasil analisis yang dikirim balik ke GUI (error diisi kalau gagal)
+AnalysisResult = namedtuple('AnalysisResult', ['request_id', 'text', 'prep_text', 'prediction', 'error'])
+
+
+# Worker untuk clean_text + inference + insert di luar main loop Tk.
+# Request baru menggantikan request lama: yang belum jalan di-cancel, yang sudah jalan dibuang hasilnya.
+# Dengan cache (result_cache.ResultCache), teks yang pernah dianalisis tidak di-stem dan di-predict ulang.
+# Dengan writer (db_writer.DBWriter), insert dikirim ke thread writer dan hasil langsung dikembalikan tanpa menunggu commit.
+class AnalysisWorker:
+    def __init__(self, clean_text, predict, max_workers=2, db_path=DB_PATH, cache=None, model_version=None,
+                 writer=None, pool=None):
+        self.clean_text = clean_text
+        self.predict = predict
+        self.cache = cache
+        self.writer = writer
+        self.pool = pool
+        self.model_version = model_version
+        self.db_path = db_path
+        self.results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        self._lock = threading.Lock()
+        self._latest = 0
+        self._pending = None
+        self._local = threading.local()
+
+    def submit(self, text):
+        with self._lock:
+            self._latest += 1
+            request_id = self._latest
+            if self._pending is not None:
+                self._pending.cancel()
+            self._pending = self._executor.submit(self._run, request_id, text)
+        return request_id
+
+    def is_current(self, request_id):
+        return request_id == self._latest
+
+    def busy(self):
+        pending = self._pending
+        return pending is not None and not pending.done()
+
+    # Ambil hasil terbaru tanpa blocking (hasil yang sudah basi dilewati)
+    def poll(self):
+        latest = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return latest
+            if self.is_current(result.request_id):
+                latest = result
+
+    # Request yang belum jalan di-cancel, yang sedang jalan ditunggu sampai selesai (termasuk submit ke writer)
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # Koneksi SQLite per thread worker
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    def _run(self, request_id, text):
+        # SENTIMENT_PROFILE=1: setiap analisis di-profile dengan cProfile (file di profiles/)
+        if metrics.profiling:
+            with metrics.profile('analysis'):
+                self._analyze(request_id, text)
+        else:
+            with metrics.stage('analysis.request'):
+                self._analyze(request_id, text)
+
+    def _analyze(self, request_id, text):
+        try:
+            cached = self.cache.get(text) if self.cache is not None else None
+            if cached is not None:
+                prep_text, prediction = cached
+            else:
+                prep_text = self.clean_text(text)
+                if not self.is_current(request_id):
+                    return
+                prediction = self.predict(prep_text)
+                if self.cache is not None:
+                    self.cache.put(text, prep_text, prediction)
+                if not self.is_current(request_id):
+                    return
+            if self.writer is not None:
+                self.writer.submit(text, prep_text, prediction.label, self.model_version, prediction.probabilities)
+            elif self.pool is not None:
+                with self.pool.writer() as conn:
+                    insert_data(conn, text, prep_text, prediction.label, self.model_version, prediction.probabilities)
+            else:
+                insert_data(self._conn(), text, prep_text, prediction.label, self.model_version, prediction.probabilities)
+            self.results.put(AnalysisResult(request_id, text, prep_text, prediction, None))
+        except Exception as e:
+            self.results.put(AnalysisResult(request_id, text, None, None, e))
+
+
+# Layanan analisis untuk GUI. start() (dipanggil dari thread warmup) me-load stem cache dan model lalu menyiapkan
+# DBWriter, ResultCache dan AnalysisWorker; modul berat baru di-import di sini supaya window tampil duluan.
+class AnalysisServices:
+    def __init__(self, pool):
+        self.pool = pool
+        self.stem_cache = None
+        self.writer = None
+        self.worker = None
+
+    def start(self):
+        import preprocessing
+        import inference
+        from db_writer import DBWriter
+        from result_cache import ResultCache
+
+        preprocessing.stem_cache.load()
+        inference.get_model()
+        self.stem_cache = preprocessing.stem_cache
+        self.writer = DBWriter(pool=self.pool).start()
+        # Baris prediction_cache ikut grup commit writer, analisis tidak menunggu commit
+        cache = ResultCache(inference.model_version(), pool=self.pool, writer=self.writer)
+        cache.purge_stale()
+        self.worker = AnalysisWorker(
+            preprocessing.clean_text, inference.predict, cache=cache, model_version=inference.model_version(),
+            writer=self.writer,
+        )
+        return self
+
+    # Urutan penting: analisis yang sedang jalan selesai (dan submit ke writer), lalu antrean writer
+    # di-commit, baru koneksi pool ditutup. Aman dipanggil walau start() belum/gagal selesai.
+    def close(self):
+        if self.worker is not None:
+            self.worker.shutdown(wait=True)
+        if self.writer is not None:
+            self.writer.close()
+        self.pool.close()
+        if self.stem_cache is not None:
+            self.stem_cache.save()
@@ -0,0 +1,138 @@
+import argparse
+import os
+import time
+import pandas as pd
+from preprocessing import clean_many, create_pool, stem_cache
+from inference import get_model, model_version, predict_many
+from database import DB_PATH, apply_bulk_pragmas, connect, label_id, load_checkpoint, save_checkpoint
+
+BATCH_SIZE = 2000
+COMMIT_EVERY = 20000
+JOB_NAME = 'relabel'
+
+
+# Baca tweets per batch (keyset pagination via rowid, aman sambil update).
+# Baris yang sudah dilabeli skip_version dilewati.
+def iter_db_batches(conn, batch_size=BATCH_SIZE, last_rowid=0, skip_version=None):
+    where = "rowid > ?" if skip_version is None else "rowid > ? AND model_version IS NOT ?"
+    extra = () if skip_version is None else (skip_version,)
+    while True:
+        rows = conn.execute(
+            f"SELECT rowid, full_text, tweet_clean FROM tweets WHERE {where} ORDER BY rowid LIMIT ?",
+            (last_rowid, *extra, batch_size),
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_rowid = rows[-1][0]
+
+
+# Job re-labeling: skor ulang semua baris dengan model sekarang, simpan label, probabilitas dan model_version.
+# Checkpoint (rowid terakhir) di-commit bersama datanya, jadi job yang terhenti bisa dilanjutkan;
+# baris yang sudah punya model_version sekarang tidak diproses lagi.
+# Stem cache (di db_path yang sama) di-load sebelum mulai (jalur serial) dan disimpan di akhir, juga kalau job terhenti.
+def predict_db(db_path=DB_PATH, batch_size=BATCH_SIZE, pool=None, reclean=True, commit_every=COMMIT_EVERY, restart=False):
+    model = get_model()
+    version = model_version()
+    classes = [str(c) for c in model.classes_]
+    prob_columns = ", ".join(f'"prob_{cls}" = ?' for cls in classes)
+    update_sql = f"UPDATE tweets SET tweet_clean = ?, label = ?, model_version = ?, {prob_columns} WHERE rowid = ?"
+
+    stem_cache.db_path = db_path
+    stem_cache.load()
+    conn = connect(db_path)
+    try:
+        apply_bulk_pragmas(conn)
+        last_rowid = 0 if restart else load_checkpoint(conn, JOB_NAME, version)
+        if last_rowid:
+            print(f"Melanjutkan dari rowid {last_rowid} (model {version})")
+        start = time.perf_counter()
+        total = uncommitted = 0
+        for rows in iter_db_batches(conn, batch_size, last_rowid, None if restart else version):
+            if reclean:
+                cleaned = clean_many([row[1] for row in rows], pool)
+            else:
+                # Hanya baris yang tweet_clean-nya kosong (mis. hasil import export mentah) yang di-clean
+                missing = [i for i, row in enumerate(rows) if row[2] is None]
+                cleaned = [row[2] for row in rows]
+                for i, clean in zip(missing, clean_many([rows[i][1] for i in missing], pool)):
+                    cleaned[i] = clean
+            results = predict_many(cleaned, model)
+            params = [
+                (clean, label_id(result.label), version, *[result.probabilities[cls] for cls in classes], row[0])
+                for row, clean, result in zip(rows, cleaned, results)
+            ]
+            conn.executemany(update_sql, params)
+            total += len(rows)
+            uncommitted += len(rows)
+            if uncommitted >= commit_every:
+                save_checkpoint(conn, JOB_NAME, version, rows[-1][0])
+                conn.commit()
+                uncommitted = 0
+                elapsed = time.perf_counter() - start
+                print(f"{total} baris diproses ({total / elapsed:.0f} baris/detik)")
+            last_rowid = rows[-1][0]
+        save_checkpoint(conn, JOB_NAME, version, last_rowid)
+        conn.commit()
+        return total
+    finally:
+        conn.close()
+        stem_cache.save()
+
+
+def predict_csv(csv_path, output_path, batch_size=BATCH_SIZE, pool=None, reclean=True):
+    model = get_model()
+    classes = [str(c) for c in model.classes_]
+    total = 0
+    stem_cache.load()
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=batch_size):
+            if reclean or 'tweet_clean' not in chunk.columns:
+                chunk['tweet_clean'] = clean_many(chunk['full_text'].tolist(), pool)
+            cleaned = chunk['tweet_clean'].fillna("").astype(str).tolist()
+            results = predict_many(cleaned, model)
+            chunk['predicted_label'] = [result.label for result in results]
+            for cls in classes:
+                chunk[f'prob_{cls}'] = [result.probabilities[cls] for result in results]
+            chunk.to_csv(output_path, mode='w' if total == 0 else 'a', header=total == 0, index=False, encoding='utf-8')
+            total += len(chunk)
+            print(f"{total} baris diproses")
+    finally:
+        stem_cache.save()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediksi sentimen batch untuk tabel tweets atau file CSV")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--db', default=DB_PATH, help="database SQLite (tabel tweets), default sentimen.db")
+    source.add_argument('--csv', help="file CSV dengan kolom full_text")
+    parser.add_argument('--output', help="file CSV hasil (default <nama>_predicted.csv)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="jumlah proses clean_text, 1 = tanpa pool")
+    parser.add_argument('--no-reclean', action='store_true', help="pakai kolom tweet_clean yang sudah ada")
+    parser.add_argument('--commit-every', type=int, default=COMMIT_EVERY, help="jumlah baris per transaksi (--db)")
+    parser.add_argument('--restart', action='store_true', help="abaikan checkpoint, skor ulang dari awal (--db)")
+    args = parser.parse_args()
+
+    # Pool juga dipakai dengan --no-reclean: baris hasil import mentah (tweet_clean kosong) tetap di-clean
+    # Worker menyimpan stem cache ke --db (mode --csv: default sentimen.db)
+    stem_db = None if args.csv else args.db
+    pool = create_pool(args.processes, db_path=stem_db) if args.processes and args.processes > 1 else None
+    start = time.perf_counter()
+    try:
+        if args.csv:
+            output = args.output or os.path.splitext(args.csv)[0] + '_predicted.csv'
+            total = predict_csv(args.csv, output, args.batch_size, pool, not args.no_reclean)
+        else:
+            total = predict_db(args.db, args.batch_size, pool, not args.no_reclean, args.commit_every, args.restart)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    print(f"Selesai: {total} baris dalam {elapsed:.2f} detik ({total / elapsed if elapsed else 0:.0f} baris/detik)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+BENCH_CSV = os.path.join('Dataset', 'final-preprocessing (best data).csv')
+OUTPUT_PATH = 'bench_output.json'
+REGRESSION_THRESHOLD = 0.10
+
+
+def load_rows(csv_path=BENCH_CSV, limit=None):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = [(row['full_text'], row['tweet_clean'], row['label']) for row in csv.DictReader(f)]
+    return rows[:limit] if limit else rows
+
+
+# Statistik dari durasi per operasi (detik)
+def summarize(durations, ops=None):
+    durations = np.asarray(durations, dtype=np.float64)
+    ops = ops or len(durations)
+    total = float(durations.sum())
+    return {
+        "ops": ops,
+        "total_s": total,
+        "mean_us": total / ops * 1e6,
+        "p50_us": float(np.percentile(durations, 50)) * 1e6,
+        "p99_us": float(np.percentile(durations, 99)) * 1e6,
+        "ops_per_s": ops / total if total else 0.0,
+    }
+
+
+def time_each(func, items):
+    durations = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_clean_text(rows, cold=False):
+    import preprocessing
+    texts = [row[0] for row in rows]
+    results = {}
+    if cold:
+        preprocessing.stem_cache.clear()
+        results["clean_text_cold"] = summarize(time_each(preprocessing.clean_text, texts))
+    else:
+        preprocessing.stem_cache.load()
+        # Pass pertama mengisi cache (tidak diukur), supaya hasil tidak tergantung isi stem_cache di database
+        for text in texts:
+            preprocessing.clean_text(text)
+    results["clean_text"] = summarize(time_each(preprocessing.clean_text, texts))
+    return results
+
+
+def bench_predict(rows, batch_sizes=(32, 256)):
+    from inference import get_model, predict_many
+    model = get_model()
+    texts = [row[1] for row in rows]
+    predict_many(texts[:10], model)
+    results = {"predict_single": summarize(time_each(lambda text: predict_many([text], model), texts))}
+    for batch_size in list(batch_sizes) + [len(texts)]:
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        durations = time_each(lambda batch: predict_many(batch, model), batches)
+        name = "predict_batch_all" if batch_size == len(texts) else f"predict_batch_{batch_size}"
+        results[name] = summarize(durations, ops=len(texts))
+    return results
+
+
+# Insert ke database sementara (skema dibuat lewat database.connect)
+def bench_insert(rows):
+    from database import INSERT_TWEET_SQL, connect, insert_data, tweet_row
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        conn = connect(os.path.join(workdir, 'single.db'))
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results["insert_single"] = summarize(time_each(lambda row: insert_data(conn, *row), rows))
+        conn.close()
+
+        conn = connect(os.path.join(workdir, 'bulk.db'))
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(INSERT_TWEET_SQL, [tweet_row(*row) for row in rows])
+        results["insert_bulk"] = summarize([time.perf_counter() - start], ops=len(rows))
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# Query chart: ringkasan label_counts vs GROUP BY langsung ke tweets
+def bench_chart_queries(rows, repeat=200):
+    from database import INSERT_TWEET_SQL, connect, get_label_counts, tweet_row
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        conn = connect(os.path.join(workdir, 'chart.db'))
+        with conn:
+            conn.executemany(INSERT_TWEET_SQL, [tweet_row(*row) for row in rows])
+        results = {
+            "chart_label_counts": summarize(time_each(lambda _: get_label_counts(conn), range(repeat))),
+            "chart_group_by": summarize(time_each(
+                lambda _: conn.execute("SELECT label, COUNT(*) FROM tweets GROUP BY label").fetchall(), range(repeat)
+            )),
+        }
+        conn.close()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+BENCHMARKS = {
+    'clean': bench_clean_text,
+    'predict': bench_predict,
+    'insert': bench_insert,
+    'chart': bench_chart_queries,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, rows, cold=False):
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        if name == 'clean':
+            results.update(bench_clean_text(rows, cold))
+        else:
+            results.update(BENCHMARKS[name](rows))
+        print(f"{name}: {time.perf_counter() - start:.1f} detik")
+    from inference import get_model
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "rows": len(rows),
+            "model": type(get_model()).__name__,
+        },
+        "results": results,
+    }
+
+
+# Bandingkan dua file JSON: mean_us naik lebih dari threshold dianggap regresi
+def compare(old, new, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    print(f"{'benchmark':<22} {'lama (us)':>12} {'baru (us)':>12} {'perubahan':>10}")
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        before, after = old["results"].get(name), new["results"].get(name)
+        if before is None or after is None:
+            before_us = '-' if before is None else f"{before['mean_us']:.1f}"
+            after_us = '-' if after is None else f"{after['mean_us']:.1f}"
+            print(f"{name:<22} {before_us:>12} {after_us:>12}")
+            continue
+        change = after["mean_us"] / before["mean_us"] - 1 if before["mean_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESI"
+            regressions.append(name)
+        print(f"{name:<22} {before['mean_us']:>12.1f} {after['mean_us']:>12.1f} {change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, inference dan database")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--rows', type=int, help="pakai N baris pertama dataset")
+    parser.add_argument('--cold', action='store_true', help="ukur juga clean_text dengan stem cache kosong (lambat)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="file JSON hasil")
+    parser.add_argument('--compare', nargs=2, metavar=('LAMA', 'BARU'), help="bandingkan dua file JSON hasil")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="batas regresi mean (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding='utf-8') as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    report = run(args.only, load_rows(limit=args.rows), args.cold)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    for name, stats in report["results"].items():
+        print(f"{name:<22} mean {stats['mean_us']:>10.1f} us  p99 {stats['p99_us']:>10.1f} us  {stats['ops_per_s']:>10.0f} ops/s")
+    print(f"Hasil disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+import metrics
+
+DB_PATH = 'sentimen.db'
+SCHEMA_VERSION = 7
+BUSY_TIMEOUT_S = 10
+MAX_READERS = 8
+
+# Label disimpan sebagai integer kecil (index di LABELS) di tweets.label dan label_counts.label
+LABELS = ('negative', 'neutral', 'positive')
+LABEL_IDS = {name: i for i, name in enumerate(LABELS)}
+PROB_COLUMNS = tuple(f"prob_{name}" for name in LABELS)
+
+# Rollup jumlah per label per bucket waktu (awal bucket dalam detik unix, UTC), dijaga trigger di tweets
+ROLLUP_TABLES = {
+    'hour': ('label_counts_hourly', 3600),
+    'day': ('label_counts_daily', 86400),
+}
+
+INSERT_TWEET_SQL = (
+    "INSERT INTO tweets (full_text, tweet_clean, label, text_hash, model_version, prob_negative, prob_neutral, prob_positive) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (text_hash) DO NOTHING"
+)
+
+
+# Hash isi teks untuk dedup (sha1, 20 byte)
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def label_id(label):
+    if label is None:
+        return None
+    try:
+        return LABEL_IDS[label]
+    except KeyError:
+        raise ValueError(f"Label tidak dikenal: {label!r}") from None
+
+
+# Parameter INSERT_TWEET_SQL untuk satu baris (probabilities: dict label -> probabilitas, opsional)
+def tweet_row(input_text, cleaned_text, label, model_version=None, probabilities=None):
+    probs = [probabilities.get(name) for name in LABELS] if probabilities else [None] * len(LABELS)
+    return (input_text, cleaned_text, label_id(label), text_hash(input_text), model_version, *probs)
+
+
+def connect(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    enable_foreign_keys(conn)
+    migrate(conn)
+    return conn
+
+
+# Foreign key SQLite mati per koneksi secara default (harus diset di luar transaksi)
+def enable_foreign_keys(conn):
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+# Pragma untuk tulis massal: WAL (pembaca tidak diblok), fsync lebih jarang, cache besar
+def apply_bulk_pragmas(conn, cache_mb=64):
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+
+
+# Pragma untuk koneksi baca: mmap untuk halaman database, cache besar, dan query_only supaya tidak ikut menulis
+def apply_read_pragmas(conn, cache_mb=16, mmap_mb=256):
+    conn.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+    conn.execute(f"PRAGMA mmap_size = {mmap_mb * 1024 * 1024}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA query_only = 1")
+
+
+# Satu koneksi writer (dipakai bergantian lewat lock) + maksimal max_readers koneksi baca yang dipinjam per query.
+# Reader tidak terikat ke thread, jadi server threaded (thread baru per request) tidak menumpuk koneksi.
+# Database dipindah ke WAL saat pool dibuat, jadi query chart/batch dari reader tidak terblokir insert,
+# dan writer dari proses lain menunggu busy timeout alih-alih langsung "database is locked".
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, timeout=BUSY_TIMEOUT_S, max_readers=MAX_READERS):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_readers = max_readers
+        self._writer = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+        enable_foreign_keys(self._writer)
+        migrate(self._writer)
+        apply_bulk_pragmas(self._writer)
+        self._write_lock = threading.Lock()
+        self._idle = []
+        self._opened = 0
+        self._closed = False
+        self._readers_cond = threading.Condition()
+
+    # with pool.reader() as conn: ... (menunggu kalau semua max_readers koneksi sedang dipakai)
+    @contextmanager
+    def reader(self):
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def _checkout(self):
+        with self._readers_cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("ConnectionPool sudah ditutup")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.max_readers:
+                    self._opened += 1
+                    break
+                self._readers_cond.wait()
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+            apply_read_pragmas(conn)
+        except Exception:
+            with self._readers_cond:
+                self._opened -= 1
+                self._readers_cond.notify()
+            raise
+        return conn
+
+    def _checkin(self, conn):
+        with self._readers_cond:
+            if self._closed:
+                conn.close()
+                self._opened -= 1
+            else:
+                self._idle.append(conn)
+            self._readers_cond.notify()
+
+    # Jumlah koneksi baca yang terbuka (dipinjam + idle)
+    def reader_count(self):
+        with self._readers_cond:
+            return self._opened
+
+    # with pool.writer() as conn: ... (hanya satu thread yang menulis pada satu waktu)
+    @contextmanager
+    def writer(self):
+        with self._write_lock:
+            yield self._writer
+
+    # Reader yang masih dipinjam ditutup saat dikembalikan
+    def close(self):
+        with self._readers_cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle.clear()
+            self._readers_cond.notify_all()
+        with self._write_lock:
+            self._writer.close()
+
+
+# Migrasi schema, versi disimpan di PRAGMA user_version
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    with conn:
+        # Kunci tulis dulu lalu baca ulang versinya: proses lain (mis. worker server) bisa sedang migrasi
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        conn.execute('CREATE TABLE IF NOT EXISTS tweets ("full_text" TEXT, "tweet_clean" TEXT, "label" TEXT)')
+        if version < 1:
+            _migrate_v1(conn)
+        if version < 2:
+            _migrate_v2(conn)
+        if version < 3:
+            _migrate_v3(conn)
+        if version < 4:
+            _migrate_v4(conn)
+        if version < 5:
+            _migrate_v5(conn)
+        if version < 6:
+            _migrate_v6(conn)
+        if version < 7:
+            _migrate_v7(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+# v1: kolom text_hash + unique index, duplikat lama dihapus (yang pertama disimpan)
+def _migrate_v1(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tweets)")}
+    if 'text_hash' not in columns:
+        conn.execute("ALTER TABLE tweets ADD COLUMN text_hash BLOB")
+    rows = conn.execute("SELECT rowid, full_text FROM tweets WHERE text_hash IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE tweets SET text_hash = ? WHERE rowid = ?",
+        [(text_hash(full_text or ""), rowid) for rowid, full_text in rows],
+    )
+    conn.execute(
+        "DELETE FROM tweets WHERE rowid NOT IN (SELECT MIN(rowid) FROM tweets GROUP BY text_hash)"
+    )
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tweets_text_hash ON tweets (text_hash)")
+
+
+# v2: tabel ringkasan jumlah per label, dijaga trigger
+def _migrate_v2(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS label_counts (label TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+    for statement in _LABEL_COUNT_TRIGGERS:
+        conn.execute(statement)
+    rebuild_label_counts(conn, commit=False)
+
+
+# v3: cache hasil prediksi per (hash input ternormalisasi, versi model), lihat result_cache.py
+def _migrate_v3(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS prediction_cache ("
+        "input_hash BLOB NOT NULL, model_version TEXT NOT NULL, tweet_clean TEXT NOT NULL, "
+        "label TEXT NOT NULL, probabilities TEXT NOT NULL, PRIMARY KEY (input_hash, model_version)"
+        ") WITHOUT ROWID"
+    )
+
+
+# v4: versi model yang menulis label tiap baris + checkpoint untuk job batch yang bisa dilanjutkan
+def _migrate_v4(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tweets)")}
+    if 'model_version' not in columns:
+        conn.execute("ALTER TABLE tweets ADD COLUMN model_version TEXT")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS job_checkpoints ("
+        "job TEXT PRIMARY KEY, model_version TEXT, last_rowid INTEGER NOT NULL, updated_at TEXT NOT NULL)"
+    )
+
+
+# Kolom tweets sejak v5 (urutan sama dengan CREATE TABLE di _create_tweets_table)
+TWEET_COLUMNS = (
+    "id", "text_hash", "full_text", "tweet_clean", "label", "model_version", "created_at",
+    "prob_negative", "prob_neutral", "prob_positive",
+)
+
+
+def _create_labels_table(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT OR REPLACE INTO labels (id, name) VALUES (?, ?)", list(enumerate(LABELS)))
+
+
+def _create_tweets_table(conn, name):
+    conn.execute(
+        f"CREATE TABLE {name} ("
+        "id INTEGER PRIMARY KEY, "
+        "text_hash BLOB NOT NULL, "
+        "full_text TEXT NOT NULL, "
+        "tweet_clean TEXT, "
+        "label INTEGER REFERENCES labels (id) CHECK (label BETWEEN 0 AND 2), "
+        "model_version TEXT, "
+        "created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)), "
+        "prob_negative REAL, prob_neutral REAL, prob_positive REAL)"
+    )
+
+
+def _create_tweet_indexes(conn):
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tweets_text_hash ON tweets (text_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tweets_label_created ON tweets (label, created_at)")
+
+
+# v5: schema ternormalisasi. id INTEGER PRIMARY KEY (alias rowid lama, checkpoint job tetap valid),
+# label integer yang mereferensikan tabel labels, created_at (unix detik), kolom probabilitas,
+# index untuk dedup dan query chart per label/waktu. File tidak lebih kecil: hash, index dan kolom probabilitas
+# membuat sentimen.db 827 KB -> 984 KB setelah VACUUM. Yang didapat GROUP BY integer dan lookup lewat index.
+# Tabel dibangun ulang dalam satu transaksi; dengan WAL pembaca lain tetap membaca snapshot lama sampai commit.
+def _migrate_v5(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tweets)")}
+    _create_labels_table(conn)
+    _create_tweets_table(conn, 'tweets_v5')
+    label_case = "CASE label " + " ".join(f"WHEN '{name}' THEN {i}" for i, name in enumerate(LABELS)) + " END"
+    probs = ", ".join(column if column in columns else "NULL" for column in PROB_COLUMNS)
+    conn.execute(
+        f"INSERT INTO tweets_v5 ({', '.join(TWEET_COLUMNS)}) "
+        f"SELECT rowid, text_hash, COALESCE(full_text, ''), tweet_clean, {label_case}, model_version, NULL, {probs} "
+        "FROM tweets ORDER BY rowid"
+    )
+    conn.execute("DROP TABLE tweets")
+    conn.execute("ALTER TABLE tweets_v5 RENAME TO tweets")
+    _create_tweet_indexes(conn)
+    conn.execute("DROP TABLE IF EXISTS label_counts")
+    conn.execute("CREATE TABLE label_counts (label INTEGER PRIMARY KEY, count INTEGER NOT NULL)")
+    for statement in _LABEL_COUNT_TRIGGERS:
+        conn.execute(statement)
+    rebuild_label_counts(conn, commit=False)
+
+
+# v6: rollup per jam dan per hari. Baris tanpa created_at (data lama sebelum backfill) tidak ikut dihitung.
+def _migrate_v6(conn):
+    for table, seconds in ROLLUP_TABLES.values():
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "bucket INTEGER NOT NULL, label INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (bucket, label)) WITHOUT ROWID"
+        )
+        for statement in _rollup_triggers(table, seconds):
+            conn.execute(statement)
+    rebuild_rollups(conn, commit=False)
+
+
+# v7: foreign key tweets.label -> labels(id). Database yang sudah v5/v6 sebelum ini (tanpa foreign key)
+# dibangun ulang sekali. DROP TABLE ikut menghapus index dan trigger, jadi semuanya dibuat lagi;
+# isi label_counts dan rollup tetap valid karena datanya sama.
+def _migrate_v7(conn):
+    if any(row[2] == 'labels' for row in conn.execute("PRAGMA foreign_key_list(tweets)")):
+        return
+    _create_labels_table(conn)
+    _create_tweets_table(conn, 'tweets_v7')
+    columns = ', '.join(TWEET_COLUMNS)
+    conn.execute(f"INSERT INTO tweets_v7 ({columns}) SELECT {columns} FROM tweets ORDER BY id")
+    conn.execute("DROP TABLE tweets")
+    conn.execute("ALTER TABLE tweets_v7 RENAME TO tweets")
+    _create_tweet_indexes(conn)
+    for statement in _LABEL_COUNT_TRIGGERS:
+        conn.execute(statement)
+    for table, seconds in ROLLUP_TABLES.values():
+        for statement in _rollup_triggers(table, seconds):
+            conn.execute(statement)
+
+
+# Posisi terakhir job untuk versi model ini (0 kalau belum pernah / versi lain)
+def load_checkpoint(conn, job, model_version):
+    row = conn.execute(
+        "SELECT last_rowid FROM job_checkpoints WHERE job = ? AND model_version IS ?", (job, model_version)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+# Disimpan di transaksi yang sama dengan update datanya (commit oleh pemanggil)
+def save_checkpoint(conn, job, model_version, last_rowid):
+    conn.execute(
+        "INSERT OR REPLACE INTO job_checkpoints (job, model_version, last_rowid, updated_at) "
+        "VALUES (?, ?, ?, datetime('now'))",
+        (job, model_version, last_rowid),
+    )
+
+
+_LABEL_COUNT_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS trg_label_counts_insert AFTER INSERT ON tweets
+    WHEN NEW.label IS NOT NULL BEGIN
+        INSERT INTO label_counts (label, count) VALUES (NEW.label, 1)
+        ON CONFLICT (label) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_label_counts_delete AFTER DELETE ON tweets
+    WHEN OLD.label IS NOT NULL BEGIN
+        UPDATE label_counts SET count = count - 1 WHERE label = OLD.label;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_label_counts_update AFTER UPDATE OF label ON tweets
+    WHEN OLD.label IS NOT NEW.label BEGIN
+        UPDATE label_counts SET count = count - 1 WHERE label = OLD.label;
+        INSERT INTO label_counts (label, count) SELECT NEW.label, 1 WHERE NEW.label IS NOT NULL
+        ON CONFLICT (label) DO UPDATE SET count = count + 1;
+    END""",
+)
+
+
+def _rollup_triggers(table, seconds):
+    bucket = f"created_at / {seconds} * {seconds}"
+    return (
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON tweets
+        WHEN NEW.label IS NOT NULL AND NEW.created_at IS NOT NULL BEGIN
+            INSERT INTO {table} (bucket, label, count) VALUES (NEW.{bucket}, NEW.label, 1)
+            ON CONFLICT (bucket, label) DO UPDATE SET count = count + 1;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON tweets
+        WHEN OLD.label IS NOT NULL AND OLD.created_at IS NOT NULL BEGIN
+            UPDATE {table} SET count = count - 1 WHERE bucket = OLD.{bucket} AND label = OLD.label;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_update AFTER UPDATE OF label, created_at ON tweets
+        WHEN OLD.label IS NOT NEW.label OR OLD.created_at IS NOT NEW.created_at BEGIN
+            UPDATE {table} SET count = count - 1 WHERE bucket = OLD.{bucket} AND label = OLD.label;
+            INSERT INTO {table} (bucket, label, count) SELECT NEW.{bucket}, NEW.label, 1
+            WHERE NEW.label IS NOT NULL AND NEW.created_at IS NOT NULL
+            ON CONFLICT (bucket, label) DO UPDATE SET count = count + 1;
+        END""",
+    )
+
+
+# Hitung ulang label_counts dari tweets (kalau ringkasan tidak sinkron)
+def rebuild_label_counts(conn, commit=True):
+    conn.execute("DELETE FROM label_counts")
+    conn.execute(
+        "INSERT INTO label_counts (label, count) "
+        "SELECT label, COUNT(*) FROM tweets WHERE label IS NOT NULL GROUP BY label"
+    )
+    if commit:
+        conn.commit()
+
+
+def rebuild_rollups(conn, commit=True):
+    for table, seconds in ROLLUP_TABLES.values():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"INSERT INTO {table} (bucket, label, count) "
+            f"SELECT created_at / {seconds} * {seconds} AS bucket, label, COUNT(*) FROM tweets "
+            "WHERE label IS NOT NULL AND created_at IS NOT NULL GROUP BY bucket, label"
+        )
+    if commit:
+        conn.commit()
+
+
+# Jumlah per label untuk chart, dibaca dari ringkasan
+def get_label_counts(conn):
+    return {LABELS[label]: count for label, count in conn.execute("SELECT label, count FROM label_counts WHERE count > 0")}
+
+
+# Tren untuk chart: `buckets` bucket terakhir sampai `end` (detik unix, default bucket terbaru yang ada datanya).
+# Hanya bucket yang diminta yang dibaca dari tabel rollup. Hasil: [(awal bucket, {label: jumlah}), ...] urut waktu.
+def get_label_trend(conn, period='day', buckets=30, end=None):
+    table, seconds = ROLLUP_TABLES[period]
+    if end is None:
+        last = conn.execute(f"SELECT MAX(bucket) FROM {table}").fetchone()[0]
+        if last is None:
+            return []
+        end = last + seconds
+    else:
+        end = (end // seconds + 1) * seconds
+    start = end - buckets * seconds
+    trend = {start + i * seconds: {} for i in range(buckets)}
+    rows = conn.execute(
+        f"SELECT bucket, label, count FROM {table} WHERE bucket >= ? AND bucket < ? AND count > 0", (start, end)
+    )
+    for bucket, label, count in rows:
+        trend[bucket][LABELS[label]] = count
+    return sorted(trend.items())
+
+
+# Insert Data
+def insert_data(conn, input_text, cleaned_text, label, model_version=None, probabilities=None):
+    try:
+        with metrics.stage('db.insert'):
+            cursor = conn.execute(
+                INSERT_TWEET_SQL, tweet_row(input_text, cleaned_text, label, model_version, probabilities)
+            )
+        with metrics.stage('db.commit'):
+            conn.commit()
+        if cursor.rowcount == 0:
+            metrics.count('db.duplicate')
+            print("Error: Data with the same input already exists. Skipping insertion.")
+            return False
+        print("Data inserted successfully.")
+        return True
+    except Exception as e:
+        print(f"An error occurred during insertion: {e}")
+        return False
+
+
+# Migrasi ke schema terbaru lalu VACUUM supaya halaman kosong dari tabel lama dikembalikan
+def vacuum(db_path=DB_PATH):
+    before = os.path.getsize(db_path)
+    conn = connect(db_path)
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return before, os.path.getsize(db_path)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+    if command == "rebuild-counts":
+        conn = connect(db_path)
+        rebuild_label_counts(conn)
+        rebuild_rollups(conn)
+        print(get_label_counts(conn))
+        conn.close()
+    elif command == "vacuum":
+        before, after = vacuum(db_path)
+        print(f"{db_path}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    else:
+        print("Usage: python database.py rebuild-counts|vacuum [db_path]")
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+import metrics
+from database import DB_PATH, INSERT_TWEET_SQL, apply_bulk_pragmas, connect, tweet_row
+
+MAX_BATCH = 100
+MAX_DELAY_MS = 5
+
+_STOP = object()
+
+
+# Write-behind untuk insert_data: thread writer memegang koneksi SQLite sendiri, mengambil baris dari queue
+# dan commit per grup (max_batch baris atau max_delay_ms setelah baris pertama). Analisis tidak lagi menunggu fsync.
+# Dengan pool (database.ConnectionPool), tiap grup ditulis lewat koneksi writer pool.
+# submit_sql() memakai grup commit yang sama untuk tulisan lain (mis. baris prediction_cache dari ResultCache).
+class DBWriter:
+    def __init__(self, db_path=DB_PATH, max_batch=MAX_BATCH, max_delay_ms=MAX_DELAY_MS, pool=None):
+        self.pool = pool
+        self.db_path = pool.db_path if pool is not None else db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.inserted = 0
+        self.duplicates = 0
+        self.commits = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+    def start(self):
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name='db-writer', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    # Sama dengan argumen insert_data, tidak blocking. Setelah close() baris tidak akan pernah ditulis, jadi ditolak.
+    def submit(self, input_text, cleaned_text, label, model_version=None, probabilities=None):
+        self.submit_sql(INSERT_TWEET_SQL, tweet_row(input_text, cleaned_text, label, model_version, probabilities))
+
+    # Satu statement + parameter, ditulis di grup commit berikutnya
+    def submit_sql(self, sql, params):
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("DBWriter sudah ditutup, baris tidak disimpan")
+            self._queue.put((sql, params))
+
+    # Masih ada baris yang belum di-commit?
+    def pending(self):
+        return self._queue.unfinished_tasks > 0
+
+    # Tunggu sampai semua baris yang sudah di-submit ter-commit
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "commits": self.commits,
+            "queued": self._queue.qsize(),
+        }
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _run(self, ready):
+        conn = None
+        if self.pool is None:
+            conn = connect(self.db_path)
+            apply_bulk_pragmas(conn)
+        ready.set()
+        try:
+            while True:
+                batch = self._collect(self._queue.get())
+                rows = [item for item in batch if item is not _STOP]
+                try:
+                    if rows and conn is None:
+                        with self.pool.writer() as pooled:
+                            self._write(pooled, rows)
+                    elif rows:
+                        self._write(conn, rows)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(rows) < len(batch):
+                    return
+        finally:
+            if conn is not None:
+                conn.close()
+
+    # Satu transaksi per grup; per baris tweets tetap dicek duplikat supaya pesannya sama dengan insert_data
+    def _write(self, conn, rows):
+        try:
+            with metrics.stage('db.group_commit'):
+                with conn:
+                    for sql, params in rows:
+                        cursor = conn.execute(sql, params)
+                        if sql is not INSERT_TWEET_SQL:
+                            continue
+                        if cursor.rowcount == 0:
+                            self.duplicates += 1
+                            metrics.count('db.duplicate')
+                            print("Error: Data with the same input already exists. Skipping insertion.")
+                        else:
+                            self.inserted += 1
+                            print("Data inserted successfully.")
+            self.commits += 1
+        except Exception as e:
+            self.error = e
+            print(f"An error occurred during insertion: {e}")
@@ -0,0 +1,117 @@
+import argparse
+import time
+import pandas as pd
+from database import DB_PATH, apply_bulk_pragmas, connect, label_id, text_hash
+
+CHUNK_SIZE = 5000
+COMMIT_EVERY = 50000
+TWITTER_TIME_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+# Kolom yang dipakai dari CSV: schema processed (full_text, tweet_clean, label) atau
+# export mentah (full_text, username, created_at, ...) yang tweet_clean/label-nya dibiarkan kosong
+def detect_columns(csv_path):
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if 'full_text' not in header:
+        raise ValueError(f"{csv_path}: kolom full_text tidak ada")
+    return [column for column in ('full_text', 'tweet_clean', 'label', 'created_at') if column in header]
+
+
+# created_at -> detik unix (UTC). Format export Twitter atau ISO 8601, yang tidak terbaca jadi None
+def parse_created_at(values):
+    times = pd.to_datetime(values, format=TWITTER_TIME_FORMAT, errors='coerce', utc=True)
+    retry = times.isna() & values.notna()
+    if retry.any():
+        times[retry] = pd.to_datetime(values[retry], format='ISO8601', errors='coerce', utc=True)
+    return [None if pd.isna(t) else int(t.timestamp()) for t in times]
+
+
+def _value(value):
+    return None if pd.isna(value) else value
+
+
+# Baca CSV per chunk dan insert ke tweets; duplikat (text_hash sama, di file maupun di database) dilewati.
+# Tanpa kolom created_at, created_at dibiarkan kosong (data historis tidak dihitung sebagai data hari ini di rollup).
+def import_csv(csv_path, db_path=DB_PATH, chunk_size=CHUNK_SIZE, commit_every=COMMIT_EVERY):
+    columns = detect_columns(csv_path)
+    conn = connect(db_path)
+    apply_bulk_pragmas(conn)
+    start = time.perf_counter()
+    read = inserted = filled = dated = uncommitted = 0
+    try:
+        for frame in pd.read_csv(csv_path, usecols=columns, dtype=str, chunksize=chunk_size):
+            frame = frame.dropna(subset=['full_text'])
+            created = parse_created_at(frame['created_at']) if 'created_at' in columns else [None] * len(frame)
+            params = [
+                (
+                    row.full_text,
+                    _value(getattr(row, 'tweet_clean', None)),
+                    label_id(_value(getattr(row, 'label', None))),
+                    text_hash(row.full_text),
+                    created_at,
+                )
+                for row, created_at in zip(frame.itertuples(index=False), created)
+            ]
+            # rowcount executemany = jumlah baris tweets yang benar-benar masuk (perubahan dari trigger tidak dihitung)
+            cursor = conn.executemany(
+                "INSERT INTO tweets (full_text, tweet_clean, label, text_hash, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (text_hash) DO NOTHING",
+                params,
+            )
+            read += len(params)
+            inserted += max(cursor.rowcount, 0)
+            # Baris lama yang belum berlabel (mis. dari export mentah) dilengkapi dari CSV processed
+            if 'label' in columns:
+                cursor = conn.executemany(
+                    "UPDATE tweets SET tweet_clean = COALESCE(tweet_clean, ?), label = ? "
+                    "WHERE text_hash = ? AND label IS NULL",
+                    [(clean, label, digest) for _, clean, label, digest, _ in params if label is not None],
+                )
+                filled += max(cursor.rowcount, 0)
+            # Backfill created_at untuk baris lama (mis. hasil migrasi atau import processed) dari export mentah
+            if 'created_at' in columns:
+                cursor = conn.executemany(
+                    "UPDATE tweets SET created_at = ? WHERE text_hash = ? AND created_at IS NULL",
+                    [(created_at, digest) for _, _, _, digest, created_at in params if created_at is not None],
+                )
+                dated += max(cursor.rowcount, 0)
+            uncommitted += len(params)
+            # Satu transaksi untuk banyak chunk
+            if uncommitted >= commit_every:
+                conn.commit()
+                uncommitted = 0
+                _report(read, inserted, filled, dated, start)
+        conn.commit()
+    finally:
+        conn.close()
+    return read, inserted, filled, dated, time.perf_counter() - start
+
+
+def _report(read, inserted, filled, dated, start):
+    elapsed = time.perf_counter() - start
+    print(
+        f"{read} baris dibaca, {inserted} baru, {filled} dilengkapi, {dated} created_at diisi "
+        f"({read / elapsed if elapsed else 0:.0f} baris/detik)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CSV Dataset (raw atau processed) ke tabel tweets")
+    parser.add_argument('csv', nargs='+', help="file CSV dengan kolom full_text")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--commit-every', type=int, default=COMMIT_EVERY, help="jumlah baris per transaksi")
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        read, inserted, filled, dated, elapsed = import_csv(csv_path, args.db, args.chunk_size, args.commit_every)
+        print(
+            f"{csv_path}: {read} baris dibaca, {inserted} baru, {filled} dilengkapi, {dated} created_at diisi, "
+            f"{read - inserted} duplikat dilewati dalam {elapsed:.2f} detik ({read / elapsed if elapsed else 0:.0f} baris/detik)"
+        )
+        if inserted and 'label' not in detect_columns(csv_path):
+            print("Label masih kosong, jalankan 'python batch_predict.py' untuk mengisinya.")
+
+
+if __name__ == "__main__":
+    main()
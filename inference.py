@@ -0,0 +1,79 @@
+import os
+import threading
+from collections import namedtuple
+import metrics
+
+MODEL_PATH = os.path.join('Model', 'best_model.pkl')
+LITE_MODEL_PATH = os.path.join('Model', 'best_model_lite')
+
+# Hasil prediksi: label, probabilitas per kelas (urut model.classes_) dan confidence
+Prediction = namedtuple('Prediction', ['label', 'probabilities', 'confidence'])
+
+_model = None
+_model_version = None
+_model_lock = threading.Lock()
+
+
+# Load model sekali per proses. Versi = 16 hex pertama sha256 pickle (berubah setiap best_model.pkl
+# di-retrain); hash yang sama dipakai untuk mengecek artefak lite, jadi pickle hanya di-hash sekali.
+def get_model():
+    global _model, _model_version
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from lite_model import file_sha256
+                source_sha256 = file_sha256(MODEL_PATH)
+                _model_version = source_sha256[:16]
+                _model = load_model(source_sha256=source_sha256)
+    return _model
+
+
+# Versi model yang sedang dipakai (dipakai sebagai bagian key cache hasil prediksi)
+def model_version():
+    get_model()
+    return _model_version
+
+
+# Utamakan artefak mmap (lite_model.py export); kalau tidak ada, rusak atau basi, pakai pickle.
+# source_sha256: hash pickle yang sudah dihitung pemanggil (pickle cukup di-hash sekali per load).
+# Checksum .npy tidak dicek di sini supaya tiap worker tidak membaca ulang semua halaman file.
+def load_model(model_path=MODEL_PATH, lite_path=LITE_MODEL_PATH, source_sha256=None, verify_checksum=False):
+    if os.path.exists(os.path.join(lite_path, 'manifest.json')):
+        try:
+            from lite_model import LiteModel
+            model = LiteModel.load(lite_path, verify_checksum=verify_checksum)
+            if model.matches_source(model_path, source_sha256):
+                return model
+            print(f"{lite_path} tidak cocok dengan {model_path}, jalankan ulang 'python lite_model.py export'.")
+        except (ValueError, KeyError, OSError) as e:
+            print(f"Gagal load {lite_path} ({e}), fallback ke pickle.")
+    import joblib
+    return joblib.load(model_path)
+
+
+# Satu kali predict_proba (TF-IDF -> chi2 -> NB), label diambil dari argmax
+def predict_many(prep_texts, model=None):
+    model = model if model is not None else get_model()
+    probabilities = _predict_proba(model, list(prep_texts))
+    classes = [str(c) for c in model.classes_]
+    results = []
+    for row, best in zip(probabilities, probabilities.argmax(axis=1)):
+        results.append(Prediction(classes[best], dict(zip(classes, row.tolist())), float(row[best])))
+    return results
+
+
+def _predict_proba(model, prep_texts):
+    if not metrics.enabled:
+        return model.predict_proba(prep_texts)
+    # Pipeline sklearn dipecah: TF-IDF + chi2 lalu NB (hasil sama dengan predict_proba pipeline)
+    if hasattr(model, 'steps'):
+        with metrics.stage('inference.transform'):
+            features = model[:-1].transform(prep_texts)
+        with metrics.stage('inference.classify'):
+            return model[-1].predict_proba(features)
+    with metrics.stage('inference.predict_proba'):
+        return model.predict_proba(prep_texts)
+
+
+def predict(prep_text, model=None):
+    return predict_many([prep_text], model)[0]
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from database import text_hash
+
+CORPUS_PATH = os.path.join('Dataset', 'processed_corpus.csv')
+LABELED_PATH = os.path.join('Dataset', 'labeled_corpus.csv')
+LABEL_CACHE_DB = os.path.join('Dataset', 'labeling_cache.db')
+CHUNK_SIZE = 200
+MAX_WORKERS = 8
+MAX_RETRIES = 5
+TRANSLATION_FAILED = "TRANSLATION_FAILED"
+
+
+# Backend terjemahan. Setiap backend punya name (bagian key cache) dan translate(text).
+class GoogleTranslatorBackend:
+    name = 'google'
+
+    def __init__(self, source='auto', target='en'):
+        from deep_translator import GoogleTranslator
+        self.translator = GoogleTranslator(source=source, target=target)
+
+    def translate(self, text):
+        return self.translator.translate(text)
+
+
+# Stub lokal untuk tes offline: teks dikembalikan apa adanya (opsional dengan delay seperti request jaringan)
+class StubTranslatorBackend:
+    name = 'stub'
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def translate(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return text
+
+
+TRANSLATORS = {
+    'google': GoogleTranslatorBackend,
+    'stub': StubTranslatorBackend,
+}
+
+
+# Polarity + label sama dengan notebook (TextBlob, > 0 positive, < 0 negative)
+def polarity(english_text):
+    from textblob import TextBlob
+    return TextBlob(english_text).sentiment.polarity
+
+
+def get_sentiment(value):
+    if value > 0:
+        return 'positive'
+    elif value < 0:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+# Cache di disk: terjemahan per (backend, hash teks) dan polarity per hash teks Inggris.
+# Hanya dipakai dari thread utama; thread worker cuma memanggil translator.
+class LabelCache:
+    def __init__(self, db_path=LABEL_CACHE_DB):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "backend TEXT NOT NULL, source_hash BLOB NOT NULL, english_text TEXT NOT NULL, "
+            "PRIMARY KEY (backend, source_hash)) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS polarity (english_hash BLOB PRIMARY KEY, polarity REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def get_translations(self, backend, texts):
+        found = {}
+        for text in set(texts):
+            row = self.conn.execute(
+                "SELECT english_text FROM translations WHERE backend = ? AND source_hash = ?", (backend, text_hash(text))
+            ).fetchone()
+            if row is not None:
+                found[text] = row[0]
+        return found
+
+    def put_translations(self, backend, pairs):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO translations (backend, source_hash, english_text) VALUES (?, ?, ?)",
+            [(backend, text_hash(text), english) for text, english in pairs],
+        )
+
+    def get_polarity(self, english_text):
+        row = self.conn.execute(
+            "SELECT polarity FROM polarity WHERE english_hash = ?", (text_hash(english_text),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_polarity(self, english_text, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO polarity (english_hash, polarity) VALUES (?, ?)", (text_hash(english_text), value)
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _translate_with_retry(translator, text, retries=MAX_RETRIES):
+    for attempt in range(retries):
+        try:
+            english = translator.translate(text)
+            if english:
+                return english
+        except Exception as e:
+            print(f"[Translate gagal, percobaan {attempt + 1}/{retries}] {e}")
+        time.sleep(min(2 ** attempt * 0.5, 8))
+    return TRANSLATION_FAILED
+
+
+# Terjemahkan teks yang belum ada di cache dengan maksimal max_workers request berjalan bersamaan
+def translate_chunk(texts, translator, cache, executor):
+    english = cache.get_translations(translator.name, texts)
+    for text in texts:
+        if not text.strip():
+            english[text] = ''
+    missing = [text for text in dict.fromkeys(texts) if text not in english]
+    results = executor.map(lambda text: _translate_with_retry(translator, text), missing)
+    done = []
+    for text, result in zip(missing, results):
+        english[text] = result
+        if result != TRANSLATION_FAILED:
+            done.append((text, result))
+    cache.put_translations(translator.name, done)
+    return [english.get(text, TRANSLATION_FAILED) for text in texts], len(missing)
+
+
+def label_chunk(english_texts, cache):
+    labels = []
+    for english in english_texts:
+        if english == TRANSLATION_FAILED:
+            labels.append(None)
+            continue
+        value = cache.get_polarity(english)
+        if value is None:
+            value = polarity(english)
+            cache.put_polarity(english, value)
+        labels.append(get_sentiment(value))
+    return labels
+
+
+# Checkpoint = jumlah baris input yang sudah ditulis + ukuran file output saat itu
+def _checkpoint_path(output_path):
+    return output_path + '.checkpoint'
+
+
+def load_checkpoint(output_path, input_path):
+    try:
+        with open(_checkpoint_path(output_path), encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if state.get('input') != os.path.abspath(input_path) or not os.path.exists(output_path):
+        return 0
+    # Buang baris yang sempat ditulis setelah checkpoint terakhir (proses mati di tengah chunk)
+    if os.path.getsize(output_path) > state['bytes']:
+        with open(output_path, 'r+b') as f:
+            f.truncate(state['bytes'])
+    return state['rows']
+
+
+def save_checkpoint(output_path, input_path, rows):
+    tmp_path = _checkpoint_path(output_path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'input': os.path.abspath(input_path), 'rows': rows, 'bytes': os.path.getsize(output_path)}, f)
+    os.replace(tmp_path, _checkpoint_path(output_path))
+
+
+# Input: CSV dengan full_text dan tweet_clean (mis. hasil preprocess_corpus.py), output: kolom processed_data.csv.
+# Output ditulis per chunk lalu checkpoint disimpan; kalau proses mati, run berikutnya lanjut dari chunk terakhir.
+# translator default Google seperti CLI; StubTranslatorBackend (teks tidak diterjemahkan) harus dipilih eksplisit.
+def label_csv(input_path=CORPUS_PATH, output_path=LABELED_PATH, translator=None, cache_path=LABEL_CACHE_DB,
+              max_workers=MAX_WORKERS, chunk_size=CHUNK_SIZE, restart=False):
+    translator = translator if translator is not None else GoogleTranslatorBackend()
+    done = 0 if restart else load_checkpoint(output_path, input_path)
+    if done:
+        print(f"Melanjutkan dari baris {done}")
+    cache = LabelCache(cache_path)
+    start = time.perf_counter()
+    total = translated = failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate') as executor:
+            reader = pd.read_csv(input_path, usecols=['full_text', 'tweet_clean'], dtype=str,
+                                 chunksize=chunk_size, keep_default_na=False)
+            # Lewati baris yang sudah selesai (dihitung per record, full_text bisa berisi newline)
+            skip = done
+            for frame in reader:
+                if skip:
+                    frame, skip = frame.iloc[skip:], max(skip - len(frame), 0)
+                    if frame.empty:
+                        continue
+                texts = frame['tweet_clean'].tolist()
+                english, new = translate_chunk(texts, translator, cache, executor)
+                labels = label_chunk(english, cache)
+                cache.commit()
+                out = pd.DataFrame({'full_text': frame['full_text'], 'tweet_clean': texts,
+                                    'english_text': english, 'label': labels})
+                out.to_csv(output_path, mode='a' if done else 'w', header=not done, index=False, encoding='utf-8')
+                done += len(frame)
+                save_checkpoint(output_path, input_path, done)
+                total += len(frame)
+                translated += new
+                failed += sum(label is None for label in labels)
+                elapsed = time.perf_counter() - start
+                print(f"{done} baris ({translated} diterjemahkan baru, {total / elapsed if elapsed else 0:.0f} baris/detik)")
+    finally:
+        cache.close()
+    return total, translated, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Labeling (terjemah -> TextBlob polarity) yang bisa dilanjutkan")
+    parser.add_argument('--input', default=CORPUS_PATH, help="CSV dengan full_text + tweet_clean")
+    parser.add_argument('--output', default=LABELED_PATH)
+    parser.add_argument('--translator', choices=sorted(TRANSLATORS), default='google')
+    parser.add_argument('--cache', default=LABEL_CACHE_DB, help="database cache terjemahan dan polarity")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="jumlah request terjemahan bersamaan")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="baris per checkpoint")
+    parser.add_argument('--restart', action='store_true', help="abaikan checkpoint, tulis ulang output")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total, translated, failed = label_csv(args.input, args.output, TRANSLATORS[args.translator](), args.cache,
+                                          args.workers, args.chunk_size, args.restart)
+    print(f"Selesai: {total} baris dalam {time.perf_counter() - start:.2f} detik, {translated} terjemahan baru, {failed} gagal")
+    if failed:
+        print("Baris yang gagal diterjemahkan label-nya kosong, jalankan ulang dengan --restart untuk mencoba lagi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import numpy as np
+from scipy import sparse
+from scipy.special import logsumexp
+
+# Scorer ringan untuk pipeline TF-IDF -> SelectKBest -> MultinomialNB tanpa import sklearn.
+# Urutan operasi float sama dengan sklearn (count -> *idf -> L2 per baris -> seleksi kolom -> X @ flp.T + prior),
+# sehingga probabilitasnya identik bit-per-bit.
+#
+# Format di disk: satu folder berisi satu .npy per array (bisa np.load(mmap_mode='r'), jadi banyak proses
+# berbagi page cache yang sama) dan manifest.json berisi versi format, opsi vectorizer, sha256 tiap file
+# serta sha256 pickle sumbernya. Vocabulary disimpan sebagai array bytes UTF-8 terurut (dicari dengan
+# np.searchsorted) plus kolom aslinya, jadi tidak ada dict per proses.
+FORMAT_VERSION = 3
+LITE_MODEL_PATH = os.path.join('Model', 'best_model_lite')
+MANIFEST = 'manifest.json'
+ARRAYS = ('classes', 'vocabulary', 'vocabulary_columns', 'idf', 'selected', 'feature_log_prob', 'class_log_prior')
+
+
+# Ratakan pipeline sklearn jadi array NumPy (butuh sklearn, hanya saat export)
+def export_model(model, path=LITE_MODEL_PATH, source_path=None):
+    steps = [step for _, step in model.steps if step is not None and step != 'passthrough']
+    vectorizer, classifier = steps[0], steps[-1]
+    selectors = [step for step in steps[1:-1] if hasattr(step, 'get_support')]
+
+    _check_vectorizer(vectorizer)
+    if not hasattr(classifier, 'feature_log_prob_') or not hasattr(classifier, 'class_log_prior_'):
+        raise ValueError(f"Classifier {type(classifier).__name__} tidak didukung, harus MultinomialNB")
+
+    # Kolom vocabulary -> kolom NB (-1 kalau dibuang SelectKBest)
+    n_features = len(vectorizer.vocabulary_)
+    selected = np.arange(n_features)
+    for selector in selectors:
+        support = selector.get_support()
+        kept = selected[selected >= 0]
+        remap = np.full(len(support), -1)
+        remap[support] = np.arange(support.sum())
+        selected[selected >= 0] = remap[kept]
+
+    terms = sorted((term.encode('utf-8'), index) for term, index in vectorizer.vocabulary_.items())
+
+    arrays = {
+        'classes': np.array([str(c) for c in classifier.classes_]),
+        'vocabulary': np.array([term for term, _ in terms], dtype=np.bytes_),
+        'vocabulary_columns': np.array([index for _, index in terms], dtype=np.int32),
+        'idf': np.asarray(vectorizer.idf_ if vectorizer.use_idf else np.ones(n_features), dtype=np.float64),
+        'selected': selected.astype(np.int32),
+        'feature_log_prob': np.ascontiguousarray(classifier.feature_log_prob_, dtype=np.float64),
+        'class_log_prior': np.asarray(classifier.class_log_prior_, dtype=np.float64),
+    }
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'source_sha256': file_sha256(source_path) if source_path else None,
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'lowercase': bool(vectorizer.lowercase),
+        'sublinear_tf': bool(vectorizer.sublinear_tf),
+        'norm': vectorizer.norm,
+        'files': {},
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        filename = f'{name}.npy'
+        np.save(os.path.join(path, filename), array, allow_pickle=False)
+        manifest['files'][name] = {'file': filename, 'sha256': file_sha256(os.path.join(path, filename))}
+    # Manifest ditulis terakhir, folder tanpa manifest dianggap belum jadi
+    with open(os.path.join(path, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _check_vectorizer(vectorizer):
+    if not hasattr(vectorizer, 'vocabulary_') or not hasattr(vectorizer, 'idf_'):
+        raise ValueError("Step pertama pipeline harus TfidfVectorizer yang sudah di-fit")
+    unsupported = {
+        'analyzer': vectorizer.analyzer != 'word',
+        'preprocessor': vectorizer.preprocessor is not None,
+        'tokenizer': vectorizer.tokenizer is not None,
+        'strip_accents': vectorizer.strip_accents is not None,
+        'stop_words': vectorizer.stop_words is not None,
+        'binary': vectorizer.binary,
+        'norm': vectorizer.norm not in ('l2', None),
+    }
+    bad = [name for name, flag in unsupported.items() if flag]
+    if bad:
+        raise ValueError(f"Opsi TfidfVectorizer tidak didukung: {', '.join(bad)}")
+
+
+class LiteModel:
+    def __init__(self, arrays, manifest):
+        version = manifest.get('format_version')
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Format model versi {version} tidak didukung (harus {FORMAT_VERSION})")
+        self.manifest = manifest
+        self.classes_ = np.asarray(arrays['classes'])
+        self.vocabulary = arrays['vocabulary']
+        self.vocabulary_columns = arrays['vocabulary_columns']
+        self.idf = arrays['idf']
+        self.selected = arrays['selected']
+        self.feature_log_prob = arrays['feature_log_prob']
+        self.class_log_prior = np.asarray(arrays['class_log_prior'])
+        self.token_pattern = re.compile(manifest['token_pattern'])
+        self.min_n, self.max_n = manifest['ngram_range']
+        self.lowercase = manifest['lowercase']
+        self.sublinear_tf = manifest['sublinear_tf']
+        self.norm = manifest['norm']
+        self.n_selected = self.feature_log_prob.shape[1]
+
+    # mmap_mode='r': array dibaca langsung dari page cache, dipakai bersama oleh semua proses.
+    # Checksum hanya dicek kalau diminta (membaca semua halaman file), cukup sekali di proses induk.
+    @classmethod
+    def load(cls, path=LITE_MODEL_PATH, mmap_mode='r', verify_checksum=False):
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = {}
+        for name in ARRAYS:
+            entry = manifest['files'][name]
+            filename = os.path.join(path, entry['file'])
+            if verify_checksum and file_sha256(filename) != entry['sha256']:
+                raise ValueError(f"Checksum {filename} tidak cocok dengan manifest")
+            arrays[name] = np.load(filename, mmap_mode=mmap_mode, allow_pickle=False)
+        return cls(arrays, manifest)
+
+    # Artefak dibuat dari pickle ini? (kalau pickle di-retrain, artefak basi).
+    # source_sha256 bisa dikirim kalau hash pickle sudah dihitung, supaya file tidak di-hash dua kali.
+    def matches_source(self, source_path=None, source_sha256=None):
+        if source_sha256 is None:
+            source_sha256 = file_sha256(source_path)
+        return self.manifest.get('source_sha256') == source_sha256
+
+    # Kolom vocabulary untuk tiap fitur (-1 kalau tidak ada)
+    def _lookup(self, features):
+        if not features:
+            return np.empty(0, dtype=np.int64)
+        keys = np.array([feature.encode('utf-8') for feature in features], dtype=np.bytes_)
+        positions = np.searchsorted(self.vocabulary, keys)
+        found = positions < len(self.vocabulary)
+        found[found] = self.vocabulary[positions[found]] == keys[found]
+        columns = np.full(len(keys), -1, dtype=np.int64)
+        columns[found] = self.vocabulary_columns[positions[found]]
+        return columns
+
+    # Sama dengan CountVectorizer._word_ngrams
+    def _analyze(self, doc):
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self.token_pattern.findall(doc)
+        if self.max_n == 1:
+            return tokens
+        original = tokens
+        tokens = list(original) if self.min_n == 1 else []
+        n_original = len(original)
+        for n in range(max(self.min_n, 2), min(self.max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(' '.join(original[i:i + n]))
+        return tokens
+
+    def transform(self, texts):
+        indices, data, indptr = [], [], [0]
+        for text in texts:
+            columns = self._lookup(self._analyze(text))
+            row, counts = np.unique(columns[columns >= 0], return_counts=True)
+            values = counts.astype(np.float64)
+            if self.sublinear_tf:
+                np.log(values, values)
+                values += 1.0
+            values *= self.idf[row]
+            if self.norm == 'l2':
+                # Jumlah kuadrat berurutan, sama dengan inplace_csr_row_normalize_l2
+                total = 0.0
+                for value in values.tolist():
+                    total += value * value
+                if total != 0.0:
+                    values /= np.sqrt(total)
+            columns = self.selected[row]
+            keep = columns >= 0
+            indices.append(columns[keep])
+            data.append(values[keep])
+            indptr.append(indptr[-1] + int(keep.sum()))
+        return sparse.csr_matrix(
+            (np.concatenate(data) if data else np.empty(0), np.concatenate(indices) if indices else np.empty(0, dtype=np.int64), indptr),
+            shape=(len(indptr) - 1, self.n_selected),
+        )
+
+    def predict_log_proba(self, texts):
+        jll = np.asarray(self.transform(texts) @ self.feature_log_prob.T) + self.class_log_prior
+        return jll - np.atleast_2d(logsumexp(jll, axis=1)).T
+
+    def predict_proba(self, texts):
+        return np.exp(self.predict_log_proba(texts))
+
+    def predict(self, texts):
+        jll = np.asarray(self.transform(texts) @ self.feature_log_prob.T) + self.class_log_prior
+        return self.classes_[jll.argmax(axis=1)]
+
+
+# Bandingkan dengan pipeline sklearn pada seluruh tweet_clean di dataset
+def verify(path=LITE_MODEL_PATH):
+    import csv
+    import joblib
+    from inference import MODEL_PATH
+    from preprocessing import PARITY_CSV
+
+    with open(PARITY_CSV, newline='', encoding='utf-8') as f:
+        texts = [row['tweet_clean'] for row in csv.DictReader(f)]
+    expected = joblib.load(MODEL_PATH).predict_proba(texts)
+    actual = LiteModel.load(path, verify_checksum=True).predict_proba(texts)
+    identical = np.array_equal(expected, actual)
+    print(f"{len(texts)} baris, probabilitas identik: {identical}, selisih maks: {np.abs(expected - actual).max():.3g}")
+    return identical
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'export':
+        import joblib
+        from inference import MODEL_PATH
+        print(f"Ditulis ke {export_model(joblib.load(MODEL_PATH), source_path=MODEL_PATH)}")
+    elif command == 'verify':
+        sys.exit(0 if verify() else 1)
+    else:
+        print("Usage: python lite_model.py [export|verify]")
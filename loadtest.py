@@ -0,0 +1,82 @@
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Client HTTP saja: tidak import preprocessing (Sastrawi + stopword tidak dibutuhkan di sini)
+TEXTS_CSV = os.path.join('Dataset', 'final-preprocessing (best data).csv')
+
+
+def load_texts(csv_path=TEXTS_CSV):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [row['full_text'] for row in csv.DictReader(f)]
+
+
+def post(url, payload):
+    body = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+# Kirim request paralel ke server lokal, laporkan p50/p99/throughput
+def run(base_url, requests, concurrency, batch_size, texts):
+    if batch_size > 1:
+        url = base_url.rstrip('/') + '/predict/batch'
+        payloads = [{"texts": random.sample(texts, batch_size)} for _ in range(requests)]
+    else:
+        url = base_url.rstrip('/') + '/predict'
+        payloads = [{"text": random.choice(texts)} for _ in range(requests)]
+
+    errors = 0
+    latencies = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(post, url, payload) for payload in payloads]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print(f"Semua {errors} request gagal")
+        return None
+    report = {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "requests_per_s": len(latencies) / elapsed,
+        "texts_per_s": len(latencies) * batch_size / elapsed,
+    }
+    for key, value in report.items():
+        print(f"{key:>15}: {value:.2f}" if isinstance(value, float) else f"{key:>15}: {value}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test untuk server.py")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=1, help="> 1 memakai /predict/batch")
+    args = parser.parse_args()
+    run(args.url, args.requests, args.concurrency, args.batch_size, load_texts())
@@ -0,0 +1,181 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Aktifkan dengan env SENTIMENT_METRICS=1 (dump ke metrics.json saat exit) atau SENTIMENT_METRICS=<path>.
+# Worker server.py dump sendiri ke metrics-<pid>.json saat berhenti.
+# Kalau mati, stage() hanya mengembalikan nullcontext yang sama, hampir tanpa biaya.
+METRICS_PATH = 'metrics.json'
+PROFILE_DIR = 'profiles'
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+enabled = False
+# Tujuan dump saat exit (None = tidak dump)
+dump_path = None
+# SENTIMENT_PROFILE=1: request GUI/server boleh di-profile dengan cProfile
+profiling = os.environ.get('SENTIMENT_PROFILE', '') not in ('', '0')
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_null = nullcontext()
+
+
+# Histogram sederhana dengan bucket tetap (batas atas inklusif, terakhir +Inf)
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self):
+        labels = [str(b) for b in self.buckets] + ['+Inf']
+        return {"buckets": dict(zip(labels, self.counts)), "count": self.total, "sum": self.sum}
+
+
+def enable(path=None):
+    global enabled, dump_path
+    enabled = True
+    if path:
+        if dump_path is None:
+            atexit.register(_dump_at_exit)
+        dump_path = path
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def observe(name, seconds):
+    with _lock:
+        histogram = _stages.get(name)
+        if histogram is None:
+            histogram = _stages[name] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+
+def count(name, n=1):
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+# with metrics.stage('clean_text.stem'): ...
+def stage(name):
+    return _timed(name) if enabled else _null
+
+
+def snapshot():
+    with _lock:
+        return {
+            "stages": {name: histogram.snapshot() for name, histogram in sorted(_stages.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def dump(path=METRICS_PATH):
+    data = snapshot()
+    data["pid"] = os.getpid()
+    data["timestamp"] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def _dump_at_exit():
+    if dump_path:
+        dump(dump_path)
+
+
+# Dump proses ini ke <path>-<pid>.json dan batalkan dump atexit. Dipanggil worker server saat berhenti:
+# child fork keluar lewat os._exit jadi atexit tidak jalan, dan tiap worker punya angka sendiri.
+def dump_process():
+    global dump_path
+    if not enabled or not dump_path:
+        return None
+    base, ext = os.path.splitext(dump_path)
+    path = dump(f"{base}-{os.getpid()}{ext}")
+    dump_path = None
+    return path
+
+
+# Proses induk yang hanya mengawasi worker tidak punya angka, jangan timpa file dump dengan snapshot kosong
+def cancel_dump():
+    global dump_path
+    dump_path = None
+
+
+# Format teks Prometheus (histogram kumulatif per stage + counter)
+def prometheus_text():
+    data = snapshot()
+    lines = [
+        "# HELP sentiment_stage_seconds Latency per stage",
+        "# TYPE sentiment_stage_seconds histogram",
+    ]
+    for name, histogram in data["stages"].items():
+        cumulative = 0
+        for le, n in histogram["buckets"].items():
+            cumulative += n
+            lines.append(f'sentiment_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'sentiment_stage_seconds_sum{{stage="{name}"}} {histogram["sum"]}')
+        lines.append(f'sentiment_stage_seconds_count{{stage="{name}"}} {histogram["count"]}')
+    lines += ["# HELP sentiment_events_total Event counters", "# TYPE sentiment_events_total counter"]
+    for name, value in data["counters"].items():
+        lines.append(f'sentiment_events_total{{name="{name}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+# cProfile untuk satu request: stats disimpan ke profiles/<label>-<waktu>.prof,
+# ringkasan (20 fungsi teratas, cumulative) ada di result["stats"] setelah blok selesai
+@contextmanager
+def profile(label='request', top=20):
+    import cProfile
+    import io
+    import pstats
+
+    result = {}
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(top)
+        result["path"] = path
+        result["stats"] = buffer.getvalue()
+        print(f"Profil disimpan ke {path}")
+
+
+_env = os.environ.get('SENTIMENT_METRICS', '')
+if _env not in ('', '0'):
+    enable(METRICS_PATH if _env == '1' else _env)
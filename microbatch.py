@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import threading
+import time
+from inference import get_model, predict_many
+from metrics import Histogram
+
+MAX_WAIT_MS = 5
+MAX_BATCH_SIZE = 64
+
+
+# Coalescer asyncio: kumpulkan request sampai max_wait_ms atau max_batch_size,
+# jalankan satu predict_proba untuk seluruh batch, lalu bagikan hasilnya ke tiap request.
+class MicroBatcher:
+    def __init__(self, model=None, max_wait_ms=MAX_WAIT_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.model = model
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = Histogram((1, 2, 4, 8, 16, 32, 64, 128, 256))
+        self.queue_depths = Histogram((0, 1, 2, 4, 8, 16, 32, 64, 128, 256))
+        self.batches = 0
+        self._queue = None
+        self._runner = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._runner = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def predict(self, prep_text):
+        future = self._loop.create_future()
+        await self._queue.put((prep_text, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Ambil yang sudah antre tanpa menunggu
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - self._loop.time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self.queue_depths.observe(self._queue.qsize())
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+            texts = [text for text, _ in batch]
+            try:
+                # predict_proba di thread executor supaya event loop tetap jalan
+                results = await self._loop.run_in_executor(None, predict_many, texts, self.model)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth(),
+            "batches": self.batches,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_histogram": self.queue_depths.snapshot(),
+        }
+
+    # Jalankan event loop di thread sendiri, untuk dipakai dari kode sync (mis. Flask threaded)
+    def start_in_thread(self):
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='microbatch', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def predict_sync(self, prep_text, timeout=None):
+        return asyncio.run_coroutine_threadsafe(self.predict(prep_text), self._loop).result(timeout)
+
+
+# Bandingkan N request konkuren: satu-satu vs lewat MicroBatcher
+async def _benchmark(texts, concurrency, max_wait_ms, max_batch_size):
+    model = get_model()
+    loop = asyncio.get_running_loop()
+
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def single(text):
+        async with semaphore:
+            return await loop.run_in_executor(None, predict_many, [text], model)
+
+    await asyncio.gather(*(single(text) for text in texts))
+    single_elapsed = time.perf_counter() - start
+
+    batcher = MicroBatcher(model, max_wait_ms, max_batch_size)
+    await batcher.start()
+    start = time.perf_counter()
+
+    async def batched(text):
+        async with semaphore:
+            return await batcher.predict(text)
+
+    await asyncio.gather(*(batched(text) for text in texts))
+    batched_elapsed = time.perf_counter() - start
+    await batcher.close()
+
+    print(f"satu-satu : {len(texts) / single_elapsed:.0f} prediksi/detik")
+    print(f"microbatch: {len(texts) / batched_elapsed:.0f} prediksi/detik ({batcher.batches} batch)")
+    print(batcher.stats()["batch_size"])
+
+
+if __name__ == "__main__":
+    import csv
+    from preprocessing import PARITY_CSV
+
+    parser = argparse.ArgumentParser(description="Benchmark microbatching predict_proba")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    args = parser.parse_args()
+    with open(PARITY_CSV, newline='', encoding='utf-8') as f:
+        texts = [row['tweet_clean'] for row in csv.DictReader(f)]
+    texts = (texts * (args.requests // len(texts) + 1))[:args.requests]
+    asyncio.run(_benchmark(texts, args.concurrency, args.max_wait_ms, args.max_batch_size))
@@ -0,0 +1,119 @@
+import argparse
+import csv
+import glob
+import os
+import time
+import pandas as pd
+import preprocessing
+from database import text_hash
+
+RAW_SOURCES = [os.path.join('Dataset', 'raw_dataset.csv')]
+RAW_SHARDS = os.path.join('Dataset', 'Raw', 'dataset*.csv')
+OUTPUT_PATH = os.path.join('Dataset', 'processed_corpus.csv')
+# Kolom sama dengan processed_data.csv, english_text dan label diisi tahap labeling
+OUTPUT_COLUMNS = ['full_text', 'tweet_clean', 'english_text', 'label']
+CHUNK_SIZE = 200
+
+
+def default_sources():
+    return RAW_SOURCES + sorted(glob.glob(RAW_SHARDS))
+
+
+# Baca full_text per chunk dari semua sumber, baris kosong dibuang, duplikat antar file dilewati
+def iter_chunks(sources, chunk_size=CHUNK_SIZE, dedup=True, limit=None):
+    seen = set()
+    total = 0
+    for path in sources:
+        for frame in pd.read_csv(path, usecols=['full_text'], dtype=str, chunksize=chunk_size):
+            texts = frame['full_text'].dropna().tolist()
+            if dedup:
+                unique = []
+                for text in texts:
+                    key = text_hash(text)
+                    if key not in seen:
+                        seen.add(key)
+                        unique.append(text)
+                texts = unique
+            if limit is not None:
+                texts = texts[:limit - total]
+            if texts:
+                total += len(texts)
+                yield texts
+            if limit is not None and total >= limit:
+                return
+
+
+# Worker dan iterasi chunk (urutan tetap, jumlah chunk yang diproses dibatasi) dari preprocessing
+def iter_cleaned(chunks, processes=None, use_cache=True):
+    processes = processes or os.cpu_count() or 1
+    if use_cache:
+        # Di-load sekali di induk, worker hasil fork langsung berbagi isinya
+        preprocessing.stem_cache.load()
+    if processes <= 1:
+        for texts, cleaned in preprocessing.iter_clean_chunks(chunks):
+            if use_cache:
+                preprocessing.stem_cache.save()
+            yield texts, cleaned
+        return
+
+    pool = preprocessing.create_pool(processes, use_cache)
+    try:
+        yield from preprocessing.iter_clean_chunks(chunks, pool, processes * 2)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def run(sources, output_path=OUTPUT_PATH, processes=None, chunk_size=CHUNK_SIZE, dedup=True, use_cache=True, limit=None):
+    start = time.perf_counter()
+    total = 0
+    writer = None
+    f = open(output_path, 'w', newline='', encoding='utf-8') if output_path else None
+    try:
+        if f is not None:
+            writer = csv.writer(f)
+            writer.writerow(OUTPUT_COLUMNS)
+        for texts, cleaned in iter_cleaned(iter_chunks(sources, chunk_size, dedup, limit), processes, use_cache):
+            if writer is not None:
+                writer.writerows((text, clean, '', '') for text, clean in zip(texts, cleaned))
+            total += len(texts)
+    finally:
+        if f is not None:
+            f.close()
+    return total, time.perf_counter() - start
+
+
+# Skala 1 -> N core, stem cache kosong di setiap run supaya adil
+def benchmark(sources, max_processes, chunk_size=CHUNK_SIZE, limit=None):
+    counts = sorted({1, max_processes} | {2 ** i for i in range(max_processes.bit_length()) if 2 ** i <= max_processes})
+    baseline = None
+    print(f"{'proses':>6} {'baris':>7} {'detik':>8} {'baris/detik':>12} {'speedup':>8}")
+    for processes in counts:
+        # Kosongkan StemCache (satu-satunya cache stem) yang ikut ter-fork ke worker
+        preprocessing.stem_cache.clear()
+        total, elapsed = run(sources, None, processes, chunk_size, use_cache=False, limit=limit)
+        baseline = baseline or elapsed
+        print(f"{processes:>6} {total:>7} {elapsed:>8.2f} {total / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing paralel raw_dataset.csv + Dataset/Raw/dataset*.csv")
+    parser.add_argument('sources', nargs='*', help="file CSV dengan kolom full_text (default raw_dataset.csv + shard Raw)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="CSV hasil, kolom sama dengan processed_data.csv")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="jumlah proses, 1 = tanpa pool")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--keep-duplicates', action='store_true', help="jangan buang full_text yang sama")
+    parser.add_argument('--limit', type=int, help="proses maksimal N baris")
+    parser.add_argument('--benchmark', action='store_true', help="ukur skala 1 -> --processes core (tanpa output)")
+    args = parser.parse_args()
+
+    sources = args.sources or default_sources()
+    if args.benchmark:
+        benchmark(sources, args.processes or 1, args.chunk_size, args.limit)
+        return
+    total, elapsed = run(sources, args.output, args.processes, args.chunk_size, not args.keep_duplicates, limit=args.limit)
+    print(f"Selesai: {total} baris ke {args.output} dalam {elapsed:.2f} detik ({total / elapsed if elapsed else 0:.0f} baris/detik)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import csv
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
+from Sastrawi.Stemmer.Stemmer import Stemmer
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+import metrics
+from resources import load_stopwords
+
+STEM_CACHE_DB = 'sentimen.db'
+STEM_CACHE_SIZE = 50000
+SAVE_RETRIES = 5
+PARITY_CSV = os.path.join('Dataset', 'final-preprocessing (best data).csv')
+
+# Satu pola untuk URL, mention, hashtag, angka dan tanda baca.
+# Mention/hashtag berhenti sebelum awal URL, sama seperti re.sub berantai yang menghapus URL lebih dulu.
+_NOT_URL = r"(?!(?:http|www)\S)"
+CLEAN_PATTERN = re.compile(rf"(?:http|www)\S+|@(?:{_NOT_URL}\w)+|#(?:{_NOT_URL}\w)+|\d+|[^\w\s]")
+
+# Kontraksi yang dipisah word_tokenize (yang memakai apostrof sudah hilang bersama tanda baca)
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+# lower() bisa menghasilkan karakter non-\w (mis. "İ" -> "i̇"), di kasus itu kontraksi bisa muncul di tengah kata
+_NON_WORD = re.compile(r"[^\w\s]")
+_CONTRACTION_PATTERN = re.compile(r"\b(?:cannot|gimme|gonna|gotta|lemme)\b|\bwanna(?=\s|$)")
+
+
+# Stem Cache (word -> stem, LRU)
+class StemCache:
+    def __init__(self, stemmer, maxsize=STEM_CACHE_SIZE, db_path=STEM_CACHE_DB):
+        self.stemmer = stemmer
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def stem(self, word):
+        with self._lock:
+            stem = self._data.get(word)
+            if stem is not None:
+                self._data.move_to_end(word)
+                self.hits += 1
+                return stem
+            self.misses += 1
+        # Sastrawi diluar lock, stemming kata yang sama dua kali tidak masalah
+        with metrics.stage('clean_text.sastrawi'):
+            stem = self.stemmer.stem(word)
+        with self._lock:
+            self._data[word] = stem
+            self._dirty[word] = stem
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return stem
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._dirty.clear()
+            self.hits = 0
+            self.misses = 0
+
+    # Load dari database (maksimal maxsize kata terbaru)
+    def load(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            _create_stem_table(conn)
+            rows = conn.execute(
+                "SELECT word, stem FROM stem_cache ORDER BY rowid DESC LIMIT ?", (self.maxsize,)
+            ).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            for word, stem in reversed(rows):
+                self._data.setdefault(word, stem)
+        return len(rows)
+
+    # Simpan stem baru ke database. Beberapa proses (worker server, pool) bisa menyimpan bersamaan:
+    # "database is locked" dicoba ulang, kalau tetap gagal stem dikembalikan ke _dirty untuk save berikutnya.
+    def save(self):
+        with self._lock:
+            dirty = list(self._dirty.items())
+            self._dirty.clear()
+        if not dirty:
+            return 0
+        for attempt in range(SAVE_RETRIES):
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=10)
+                try:
+                    _create_stem_table(conn)
+                    with conn:
+                        conn.executemany("INSERT OR REPLACE INTO stem_cache (word, stem) VALUES (?, ?)", dirty)
+                finally:
+                    conn.close()
+                return len(dirty)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                time.sleep(0.1 * 2 ** attempt)
+        with self._lock:
+            for word, stem in dirty:
+                self._dirty.setdefault(word, stem)
+        print(f"Stem cache gagal disimpan (database terkunci), {len(dirty)} stem disimpan lagi nanti")
+        return 0
+
+
+def _create_stem_table(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS stem_cache (word TEXT PRIMARY KEY, stem TEXT NOT NULL)")
+
+
+# Preprocessor. Stemmer Sastrawi tanpa CachedStemmer (create_stemmer): ArrayCache-nya tidak terbatas,
+# jadi StemCache satu-satunya cache dan STEM_CACHE_SIZE benar-benar membatasi memori.
+stemmer_factory = StemmerFactory()
+stemmer = Stemmer(ArrayDictionary(stemmer_factory.get_words()))
+stop_words = load_stopwords()
+stem_cache = StemCache(stemmer)
+
+
+# Tokenisasi satu pass: hapus pola, lowercase, split, lalu buang stopword
+def tokenize(text):
+    if not isinstance(text, str):
+        return
+    text = CLEAN_PATTERN.sub('', text).lower()
+    if not text.isascii() and _NON_WORD.search(text):
+        text = _CONTRACTION_PATTERN.sub(lambda m: ' ' + ' '.join(CONTRACTIONS[m.group()]) + ' ', text)
+    for word in text.split():
+        for token in CONTRACTIONS.get(word, (word,)):
+            if token not in stop_words:
+                yield token
+
+
+# Clean Data
+def clean_text(text):
+    if not metrics.enabled:
+        return ' '.join([stem_cache.stem(word) for word in tokenize(text)])
+    # Diukur per tahap: regex + tokenisasi + stopword, lalu stemming (termasuk lookup cache)
+    with metrics.stage('clean_text.tokenize'):
+        words = list(tokenize(text))
+    with metrics.stage('clean_text.stem'):
+        return ' '.join([stem_cache.stem(word) for word in words])
+
+
+# Clean banyak teks sekaligus, paralel kalau ada pool dari create_pool()
+def clean_many(texts, pool=None, chunksize=256):
+    texts = list(texts)
+    if pool is None:
+        return [clean_text(text) for text in texts]
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    return [cleaned for chunk in pool.map(_clean_chunk, chunks) for cleaned in chunk]
+
+
+# Clean per chunk, hasil (texts, cleaned) dengan urutan sama dengan input. Dengan pool, chunk yang sedang
+# diproses dibatasi max_inflight supaya memori tetap kecil walau input berupa stream panjang.
+def iter_clean_chunks(chunks, pool=None, max_inflight=8):
+    if pool is None:
+        for texts in chunks:
+            yield texts, [clean_text(text) for text in texts]
+        return
+    pending = deque()
+    for texts in chunks:
+        pending.append((texts, pool.apply_async(_clean_chunk, (texts,))))
+        if len(pending) >= max_inflight:
+            texts, result = pending.popleft()
+            yield texts, result.get()
+    while pending:
+        texts, result = pending.popleft()
+        yield texts, result.get()
+
+
+# use_cache=False: worker tidak load/simpan stem cache (mis. benchmark dengan cache kosong).
+# db_path: database stem cache di worker (default stem_cache.db_path)
+def create_pool(processes=None, use_cache=True, db_path=None):
+    return multiprocessing.Pool(processes, initializer=_init_worker, initargs=(use_cache, db_path))
+
+
+# Worker pool: stem cache diwarisi dari proses induk (fork) atau di-load dari database,
+# kata baru disimpan lagi ke database setiap selesai satu chunk supaya dipakai run berikutnya
+_save_cache = True
+
+
+def _init_worker(use_cache=True, db_path=None):
+    global _save_cache
+    _save_cache = use_cache
+    if db_path is not None:
+        stem_cache.db_path = db_path
+    if use_cache and stem_cache.stats()['size'] == 0:
+        stem_cache.load()
+
+
+def _clean_chunk(texts):
+    cleaned = [clean_text(text) for text in texts]
+    if _save_cache:
+        stem_cache.save()
+    return cleaned
+
+
+# Stopword versi lama langsung dari corpus NLTK (bukan file vendored), supaya list yang salah ikut ketahuan
+_reference_stop_words = None
+
+
+def reference_stop_words():
+    global _reference_stop_words
+    if _reference_stop_words is None:
+        from nltk.corpus import stopwords
+        _reference_stop_words = set(stopwords.words('indonesian'))
+    return _reference_stop_words
+
+
+# Versi lama (re.sub berantai + word_tokenize + stopword NLTK) sampai buang stopword, sebelum stemming.
+# preserve_line=True melewati punkt: tanda akhir kalimat sudah terhapus, jadi token yang dihasilkan sama.
+def reference_tokens(text, preserve_line=False):
+    from nltk.tokenize import word_tokenize
+
+    if not isinstance(text, str):
+        return []
+
+    text = re.sub(r"http\S+|www\S+|https\S+", '', text, flags=re.MULTILINE)   # Menghapus URL
+    text = re.sub(r'@\w+', '', text) # Menghapus mention (@username)
+    text = re.sub(r'#\w+', '', text) # Menghapus hashtag (#hashtag)
+    text = re.sub(r'\d+', '', text) # Menghapus angka
+    text = re.sub(r'[^\w\s]', '', text) # Menghapus tanda baca kecuali spasi
+    text = text.lower() # Mengubah teks menjadi lowercase
+    words = word_tokenize(text, preserve_line=preserve_line) #Tokenisasi
+    reference_stops = reference_stop_words()
+    return [word for word in words if word not in reference_stops]
+
+
+# Versi lama lengkap (clean_text baseline), dipakai untuk cek paritas (butuh punkt dan stopwords di nltk_data lokal)
+def clean_text_reference(text):
+    return ' '.join([_reference_stem(word) for word in reference_tokens(text)])
+
+
+# Memo stem untuk versi lama (seperti CachedStemmer di baseline), hanya dipakai alat cek paritas
+_reference_stems = {}
+
+
+def _reference_stem(word):
+    stem = _reference_stems.get(word)
+    if stem is None:
+        stem = _reference_stems[word] = stemmer.stem(word)
+    return stem
+
+
+# Cek paritas clean_text vs versi lama pada seluruh dataset
+def check_parity(csv_path=PARITY_CSV):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        texts = [row['full_text'] for row in csv.DictReader(f)]
+    mismatches = [text for text in texts if clean_text(text) != clean_text_reference(text)]
+    return len(texts), mismatches
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--parity"]:
+        total, mismatches = check_parity()
+        for text in mismatches[:10]:
+            print(f"MISMATCH: {text!r}")
+        print(f"{total - len(mismatches)}/{total} baris identik")
+        sys.exit(1 if mismatches else 0)
+    print("Usage: python preprocessing.py --parity")
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+# Stopword Indonesia (vendored, satu kata per baris) supaya startup tidak perlu nltk.download
+STOPWORDS_PATH = os.path.join('Model', 'stopwords_indonesian.txt')
+
+
+def _read_stopwords(path):
+    with open(path, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+# Ambil dari corpus NLTK lokal saja (LookupError kalau belum ada, tidak download)
+def _nltk_stopwords():
+    from nltk.corpus import stopwords
+    return stopwords.words('indonesian')
+
+
+# Tulis file vendored dari corpus NLTK lokal
+def vendor_stopwords(path=STOPWORDS_PATH):
+    words = sorted(set(_nltk_stopwords()))
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(words) + '\n')
+    return len(words)
+
+
+# File vendored dulu; kalau tidak ada/tidak terbaca pakai corpus NLTK lokal di memori (tidak menulis ke Model/)
+def load_stopwords(path=STOPWORDS_PATH):
+    try:
+        return _read_stopwords(path)
+    except OSError:
+        pass
+    try:
+        return set(_nltk_stopwords())
+    except (LookupError, OSError):
+        raise RuntimeError(
+            f"Stopword Indonesia tidak ditemukan di {path} maupun di nltk_data lokal. "
+            "Jalankan sekali di mesin yang online: python -m nltk.downloader stopwords "
+            "lalu python resources.py vendor"
+        ) from None
+
+
+# Cek resource NLTK yang sudah ada di disk (tanpa network)
+def has_nltk_resource(resource):
+    import nltk
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
+# Bandingkan bootstrap lama (nltk.download tiap start) dengan load_stopwords
+def benchmark(path=STOPWORDS_PATH):
+    start = time.perf_counter()
+    load_stopwords(path)
+    vendored = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import nltk
+    for package in ('punkt', 'punkt_tab', 'stopwords'):
+        nltk.download(package, quiet=True)
+    try:
+        _nltk_stopwords()
+    except LookupError:
+        pass
+    legacy = time.perf_counter() - start
+
+    print(f"nltk.download x3 + stopwords.words : {legacy * 1000:.1f} ms")
+    print(f"load_stopwords (vendored)          : {vendored * 1000:.1f} ms")
+    return legacy, vendored
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'vendor':
+        print(f"{vendor_stopwords()} stopword ditulis ke {STOPWORDS_PATH}")
+    elif command == 'check':
+        print(f"{STOPWORDS_PATH}: {'ada' if os.path.exists(STOPWORDS_PATH) else 'tidak ada'}")
+        print(f"corpora/stopwords: {'ada' if has_nltk_resource('corpora/stopwords') else 'tidak ada'}")
+    elif command == 'benchmark':
+        benchmark()
+    else:
+        print("Usage: python resources.py [vendor|check|benchmark]")
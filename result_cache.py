@@ -0,0 +1,158 @@
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import metrics
+from database import DB_PATH, connect, text_hash
+from inference import Prediction
+
+RESULT_CACHE_SIZE = 10000
+INSERT_CACHE_SQL = (
+    "INSERT OR REPLACE INTO prediction_cache (input_hash, model_version, tweet_clean, label, probabilities) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+# Normalisasi input: hanya spasi yang dirapikan, hasil clean_text tidak berubah
+# (huruf besar/kecil dibiarkan karena pola URL di preprocessing case-sensitive)
+def normalize_text(text):
+    return ' '.join(text.split())
+
+
+# Cache hasil analisis dua level: LRU di memori lalu tabel prediction_cache di sentimen.db.
+# Key = hash input ternormalisasi + versi model, jadi hit melewati stemming dan inference,
+# dan entri dari model lama otomatis tidak terpakai (dibuang oleh purge_stale) setelah best_model.pkl berubah.
+# Dengan pool (database.ConnectionPool), lookup lewat reader dan put/purge lewat writer pool.
+# Dengan writer (db_writer.DBWriter), put hanya mengisi LRU dan baris tabel ikut grup commit writer (tidak menunggu commit).
+class ResultCache:
+    def __init__(self, model_version, maxsize=RESULT_CACHE_SIZE, db_path=DB_PATH, pool=None, writer=None):
+        self.model_version = model_version
+        self.maxsize = maxsize
+        self.pool = pool
+        self.writer = writer
+        self.db_path = pool.db_path if pool is not None else db_path
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Tanpa pool: koneksi SQLite per thread
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    @contextmanager
+    def _read_conn(self):
+        if self.pool is not None:
+            with self.pool.reader() as conn:
+                yield conn
+        else:
+            yield self._conn()
+
+    @contextmanager
+    def _write_conn(self):
+        if self.pool is not None:
+            with self.pool.writer() as conn:
+                yield conn
+        else:
+            yield self._conn()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    # (tweet_clean, Prediction) atau None
+    def get(self, text):
+        key = text_hash(normalize_text(text))
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                metrics.count('result_cache.hit')
+                return value
+        with self._read_conn() as conn:
+            row = conn.execute(
+                "SELECT tweet_clean, label, probabilities FROM prediction_cache WHERE input_hash = ? AND model_version = ?",
+                (key, self.model_version),
+            ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            metrics.count('result_cache.miss')
+            return None
+        prep_text, label, probabilities = row
+        probabilities = json.loads(probabilities)
+        value = (prep_text, Prediction(label, probabilities, probabilities[label]))
+        self._remember(key, value)
+        with self._lock:
+            self.db_hits += 1
+        metrics.count('result_cache.db_hit')
+        return value
+
+    def put(self, text, prep_text, prediction):
+        self.put_many([(text, prep_text, prediction)])
+
+    # items: (text, tweet_clean, Prediction); semua ditulis dalam satu transaksi
+    def put_many(self, items):
+        rows = []
+        for text, prep_text, prediction in items:
+            key = text_hash(normalize_text(text))
+            self._remember(key, (prep_text, prediction))
+            rows.append((key, self.model_version, prep_text, prediction.label, json.dumps(prediction.probabilities)))
+        if not rows:
+            return 0
+        if self.writer is not None:
+            for row in rows:
+                self.writer.submit_sql(INSERT_CACHE_SQL, row)
+            return len(rows)
+        with self._write_conn() as conn, conn:
+            conn.executemany(INSERT_CACHE_SQL, rows)
+        return len(rows)
+
+    # Hapus entri dari versi model lain
+    def purge_stale(self):
+        with self._write_conn() as conn, conn:
+            return conn.execute(
+                "DELETE FROM prediction_cache WHERE model_version != ?", (self.model_version,)
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.db_hits + self.misses
+            return {
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "model_version": self.model_version,
+                "hit_rate": (self.hits + self.db_hits) / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.db_hits = 0
+            self.misses = 0
+
+
+# clean_text + predict lewat cache, hasil: (tweet_clean, Prediction, cached)
+def analyze(text, clean_text, predict, cache=None):
+    if cache is not None:
+        cached = cache.get(text)
+        if cached is not None:
+            return cached[0], cached[1], True
+    prep_text = clean_text(text)
+    prediction = predict(prep_text)
+    if cache is not None:
+        cache.put(text, prep_text, prediction)
+    return prep_text, prediction, False
@@ -0,0 +1,214 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+from flask import Flask, Response, jsonify, request
+import metrics
+from werkzeug.serving import make_server
+from database import DB_PATH, ConnectionPool, get_label_counts, insert_data
+from microbatch import MAX_WAIT_MS, MicroBatcher
+from result_cache import ResultCache, analyze
+
+MAX_BATCH = 1000
+STEM_SAVE_INTERVAL = 60
+
+
+# max_batch_size > 0: /predict lewat MicroBatcher (request konkuren digabung jadi satu predict_proba)
+# use_cache: hasil per teks di-cache (LRU per proses + tabel prediction_cache di db_path)
+def create_app(db_path=DB_PATH, max_batch_size=0, max_wait_ms=MAX_WAIT_MS, use_cache=True):
+    # Komponen berat di-load sekali per proses worker
+    from preprocessing import clean_text, clean_many, stem_cache
+    from inference import get_model, model_version, predict, predict_many
+
+    # Stem cache ikut database yang dilayani (load di sini, save di _run_until_stopped)
+    stem_cache.db_path = db_path
+    stem_cache.load()
+    model = get_model()
+    batcher = None
+    if max_batch_size > 0:
+        batcher = MicroBatcher(model, max_wait_ms, max_batch_size).start_in_thread()
+    version = model_version()
+    # Pool per proses: reader per thread untuk /distribution dan cache, satu writer untuk insert
+    pool = ConnectionPool(db_path)
+    cache = ResultCache(version, pool=pool) if use_cache else None
+    if cache is not None:
+        cache.purge_stale()
+
+    def predict_one_text(prep_text):
+        return batcher.predict_sync(prep_text) if batcher is not None else predict(prep_text, model)
+
+    app = Flask(__name__)
+
+    def to_json(prep_text, result):
+        return {
+            "label": result.label,
+            "probabilities": result.probabilities,
+            "confidence": result.confidence,
+            "tweet_clean": prep_text,
+        }
+
+    @app.get("/health")
+    def health():
+        return jsonify(status="ok", classes=[str(c) for c in model.classes_])
+
+    # {"text": "...", "store": false}; /predict?profile=1 (kalau SENTIMENT_PROFILE=1) ikut mengembalikan ringkasan cProfile
+    @app.post("/predict")
+    def predict_one():
+        data = request.get_json(silent=True) or {}
+        text = data.get("text")
+        if not isinstance(text, str) or not text.strip():
+            return jsonify(error="field 'text' wajib diisi"), 400
+        if metrics.profiling and request.args.get("profile"):
+            with metrics.profile('predict') as profiled:
+                response = handle_predict(text, data)
+            return jsonify(**response, profile=profiled["stats"])
+        return jsonify(handle_predict(text, data))
+
+    def handle_predict(text, data):
+        with metrics.stage('server.predict'):
+            prep_text, result, _ = analyze(text, clean_text, predict_one_text, cache)
+            if data.get("store"):
+                with pool.writer() as conn:
+                    insert_data(conn, text, prep_text, result.label, version, result.probabilities)
+        return to_json(prep_text, result)
+
+    # {"texts": ["...", "..."], "store": false}
+    @app.post("/predict/batch")
+    def predict_batch():
+        data = request.get_json(silent=True) or {}
+        texts = data.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify(error="field 'texts' harus list of string"), 400
+        if len(texts) > MAX_BATCH:
+            return jsonify(error=f"maksimal {MAX_BATCH} teks per request"), 413
+        cached = [cache.get(text) for text in texts] if cache is not None else [None] * len(texts)
+        missing = [i for i, hit in enumerate(cached) if hit is None]
+        if missing:
+            missing_prep = clean_many([texts[i] for i in missing])
+            for i, prep_text, result in zip(missing, missing_prep, predict_many(missing_prep, model)):
+                cached[i] = (prep_text, result)
+            # Semua miss masuk prediction_cache dalam satu commit
+            if cache is not None:
+                cache.put_many((texts[i], *cached[i]) for i in missing)
+        prep_texts = [hit[0] for hit in cached]
+        results = [hit[1] for hit in cached]
+        if data.get("store"):
+            with pool.writer() as conn:
+                for text, prep_text, result in zip(texts, prep_texts, results):
+                    insert_data(conn, text, prep_text, result.label, version, result.probabilities)
+        return jsonify(results=[to_json(p, r) for p, r in zip(prep_texts, results)])
+
+    @app.get("/distribution")
+    def distribution():
+        with pool.reader() as conn:
+            counts = get_label_counts(conn)
+        return jsonify(counts=counts, total=sum(counts.values()))
+
+    @app.get("/metrics/batching")
+    def batching_metrics():
+        if batcher is None:
+            return jsonify(enabled=False)
+        return jsonify(enabled=True, **batcher.stats())
+
+    @app.get("/metrics/cache")
+    def cache_metrics():
+        if cache is None:
+            return jsonify(enabled=False)
+        return jsonify(enabled=True, **cache.stats())
+
+    # Format teks Prometheus (per proses worker); aktif kalau SENTIMENT_METRICS diset
+    @app.get("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+    @app.errorhandler(sqlite3.Error)
+    def database_error(e):
+        return jsonify(error=f"database error: {e}"), 503
+
+    return app
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+# Serve sampai SIGTERM/Ctrl+C. Stem baru disimpan berkala dan sekali lagi saat berhenti (seperti on_closing di GUI),
+# metrics (kalau aktif) di-dump per proses ke metrics-<pid>.json.
+def _run_until_stopped(server):
+    from preprocessing import stem_cache
+
+    stopped = threading.Event()
+
+    def save_periodically():
+        while not stopped.wait(STEM_SAVE_INTERVAL):
+            stem_cache.save()
+
+    signal.signal(signal.SIGTERM, _stop)
+    threading.Thread(target=save_periodically, name='stem-cache-save', daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Sinyal kedua tidak boleh memotong penyimpanan
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        stopped.set()
+        server.server_close()
+        saved = stem_cache.save()
+        print(f"[{os.getpid()}] stem cache disimpan ({saved} stem baru)")
+        dumped = metrics.dump_process()
+        if dumped:
+            print(f"[{os.getpid()}] metrics disimpan ke {dumped}")
+
+
+def _serve(fd, host, port, db_path, batching):
+    app = create_app(db_path, *batching)
+    server = make_server(host, port, app, threaded=True, fd=fd)
+    _run_until_stopped(server)
+
+
+# Beberapa proses worker berbagi satu socket listen (fork, POSIX). Di Windows jalan satu proses threaded.
+def serve(host='127.0.0.1', port=5000, processes=1, db_path=DB_PATH, batching=(0, MAX_WAIT_MS)):
+    if processes <= 1 or os.name != 'posix':
+        if processes > 1:
+            print("Multi-proses butuh fork (POSIX), jalan satu proses threaded.")
+        _run_until_stopped(make_server(host, port, create_app(db_path, *batching), threaded=True))
+        return
+
+    listener = socket.create_server((host, port), backlog=128)
+    fd = listener.fileno()
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_serve, args=(fd, host, port, db_path, batching), daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    print(f"Serving http://{host}:{port} dengan {processes} proses")
+    metrics.cancel_dump()
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # SIGTERM ke worker lalu tunggu, supaya stem cache sempat disimpan
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join(timeout=30)
+        listener.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP inference service untuk model sentimen")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--max-batch-size', type=int, default=0, help="aktifkan microbatching /predict (0 = mati)")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.processes, args.db, (args.max_batch_size, args.max_wait_ms))
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Modul ada di root repo dan memakai path relatif (Model/, Dataset/), jadi tes dijalankan dari root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+# Tes bertanda @pytest.mark.slow (mis. paritas clean_text penuh dengan stemming) hanya jalan dengan --runslow
+def pytest_addoption(parser):
+    parser.addoption('--runslow', action='store_true', help="jalankan juga tes yang ditandai slow")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: tes lama, hanya jalan dengan --runslow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--runslow'):
+        return
+    import pytest
+    skip_slow = pytest.mark.skip(reason="tes lama, jalankan dengan --runslow")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
@@ -0,0 +1,154 @@
+import csv
+import os
+import sqlite3
+import pytest
+import database
+from database import LABEL_IDS, LABELS, ROLLUP_TABLES, SCHEMA_VERSION
+
+V0_SOURCE_CSV = os.path.join('Dataset', 'processed_data.csv')
+# Schema tweets sebelum migrasi (sama dengan sentimen.db di baseline)
+V0_SCHEMA = 'CREATE TABLE "tweets" (\n"full_text" TEXT,\n  "tweet_clean" TEXT,\n  "label" TEXT\n)'
+V0_DUPLICATES = 19
+
+
+# Database versi 0 dibangun sendiri di tmp (bukan salinan sentimen.db yang ikut dimigrasi saat app jalan):
+# baris processed_data.csv, 19 baris diulang dengan label lain, plus full_text NULL dan kosong (hash sama)
+@pytest.fixture
+def v0_db(tmp_path):
+    with open(V0_SOURCE_CSV, newline='', encoding='utf-8') as f:
+        rows = [(row['full_text'], row['tweet_clean'], row['label']) for row in csv.DictReader(f)]
+    duplicates = [
+        (full_text, tweet_clean, LABELS[(LABEL_IDS[label] + 1) % len(LABELS)])
+        for full_text, tweet_clean, label in rows[:V0_DUPLICATES]
+    ]
+    path = str(tmp_path / 'sentimen_v0.db')
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(V0_SCHEMA)
+        conn.executemany(
+            "INSERT INTO tweets (full_text, tweet_clean, label) VALUES (?, ?, ?)",
+            rows[:1000] + duplicates + [(None, None, 'neutral'), ("", "", 'negative')] + rows[1000:],
+        )
+        conn.commit()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    finally:
+        conn.close()
+    return path
+
+
+# Jumlah per label versi v0 setelah dedup (baris pertama per full_text disimpan), dalam label integer
+def expected_v0_counts(path):
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT label, COUNT(*) FROM tweets WHERE rowid IN "
+            "(SELECT MIN(rowid) FROM tweets GROUP BY COALESCE(full_text, '')) GROUP BY label"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {LABEL_IDS[label]: count for label, count in rows}
+
+
+def label_counts(conn):
+    return dict(conn.execute("SELECT label, count FROM label_counts WHERE count > 0"))
+
+
+def grouped_label_counts(conn):
+    return dict(conn.execute("SELECT label, COUNT(*) FROM tweets WHERE label IS NOT NULL GROUP BY label"))
+
+
+def rollup_counts(conn, table):
+    return dict(((bucket, label), count) for bucket, label, count in conn.execute(
+        f"SELECT bucket, label, count FROM {table} WHERE count > 0"
+    ))
+
+
+def grouped_rollup_counts(conn, seconds):
+    return dict(((bucket, label), count) for bucket, label, count in conn.execute(
+        f"SELECT created_at / {seconds} * {seconds} AS bucket, label, COUNT(*) FROM tweets "
+        "WHERE label IS NOT NULL AND created_at IS NOT NULL GROUP BY bucket, label"
+    ))
+
+
+def label_foreign_keys(conn):
+    return [(row[2], row[3], row[4]) for row in conn.execute("PRAGMA foreign_key_list(tweets)")]
+
+
+def assert_aggregates_match(conn):
+    assert label_counts(conn) == grouped_label_counts(conn)
+    for table, seconds in ROLLUP_TABLES.values():
+        assert rollup_counts(conn, table) == grouped_rollup_counts(conn, seconds)
+
+
+def test_migrate_v0_to_latest(v0_db):
+    expected = expected_v0_counts(v0_db)
+    conn = database.connect(v0_db)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION == 7
+        assert label_foreign_keys(conn) == [('labels', 'label', 'id')]
+        assert dict(conn.execute("SELECT id, name FROM labels")) == dict(enumerate(LABELS))
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(tweets)")]
+        assert columns[:3] == ['id', 'text_hash', 'full_text']
+        total, unique_hashes = conn.execute("SELECT COUNT(*), COUNT(DISTINCT text_hash) FROM tweets").fetchone()
+        assert total == unique_hashes == sum(expected.values())
+        with open(V0_SOURCE_CSV, newline='', encoding='utf-8') as f:
+            assert total == sum(1 for _ in csv.DictReader(f)) + 1
+        assert grouped_label_counts(conn) == expected
+        assert_aggregates_match(conn)
+        # Migrasi kedua tidak mengubah apa-apa
+        database.migrate(conn)
+        assert label_counts(conn) == expected
+    finally:
+        conn.close()
+
+
+def test_triggers_keep_aggregates_in_sync(v0_db):
+    conn = database.connect(v0_db)
+    try:
+        assert database.insert_data(conn, "tes trigger baru", "tes trigger", 'positive', 'v-test')
+        assert not database.insert_data(conn, "tes trigger baru", "tes trigger", 'negative', 'v-test')
+        row_id = conn.execute("SELECT id FROM tweets WHERE full_text = ?", ("tes trigger baru",)).fetchone()[0]
+        assert conn.execute("SELECT created_at FROM tweets WHERE id = ?", (row_id,)).fetchone()[0] is not None
+        assert_aggregates_match(conn)
+
+        conn.execute("UPDATE tweets SET label = ? WHERE id = ?", (LABEL_IDS['negative'], row_id))
+        conn.commit()
+        assert_aggregates_match(conn)
+
+        # Pindah bucket waktu dan label dilepas (NULL)
+        conn.execute("UPDATE tweets SET created_at = created_at - 2 * 86400 WHERE id = ?", (row_id,))
+        conn.execute("UPDATE tweets SET label = NULL WHERE id = (SELECT MIN(id) FROM tweets)")
+        conn.commit()
+        assert_aggregates_match(conn)
+
+        conn.execute("DELETE FROM tweets WHERE id = ?", (row_id,))
+        conn.execute("DELETE FROM tweets WHERE id IN (SELECT id FROM tweets WHERE label IS NOT NULL LIMIT 10)")
+        conn.commit()
+        assert_aggregates_match(conn)
+    finally:
+        conn.close()
+
+
+# Database yang sudah v6 sebelum ada foreign key: v7 membangun ulang tweets, trigger ikut dibuat lagi
+def test_migrate_v6_without_foreign_key(v0_db):
+    conn = database.connect(v0_db)
+    try:
+        conn.executescript(
+            "PRAGMA foreign_keys = OFF;"
+            "CREATE TABLE tweets_old AS SELECT * FROM tweets;"
+            "DROP TABLE tweets;"
+            "ALTER TABLE tweets_old RENAME TO tweets;"
+            "PRAGMA user_version = 6;"
+        )
+        assert label_foreign_keys(conn) == []
+        database.enable_foreign_keys(conn)
+        database.migrate(conn)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert label_foreign_keys(conn) == [('labels', 'label', 'id')]
+        assert_aggregates_match(conn)
+        assert database.insert_data(conn, "tes setelah v7", "tes", 'neutral', 'v-test')
+        assert_aggregates_match(conn)
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("DELETE FROM labels WHERE id = ?", (LABEL_IDS['neutral'],))
+    finally:
+        conn.close()
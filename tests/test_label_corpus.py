@@ -0,0 +1,93 @@
+import csv
+import os
+import threading
+import pandas as pd
+import pytest
+import label_corpus
+from label_corpus import StubTranslatorBackend
+
+SOURCE_CSV = os.path.join('Dataset', 'processed_data.csv')
+N_ROWS = 60
+CHUNK_SIZE = 10
+# Terjemahan ke-N (dari run pertama) mematikan proses, di tengah chunk ke-3
+KILL_AT_CALL = 25
+
+
+# Stub yang mencatat teks yang diterjemahkan; kill_at_call mensimulasikan proses mati (Ctrl+C) di tengah file
+class RecordingTranslator(StubTranslatorBackend):
+    def __init__(self, kill_at_call=None):
+        super().__init__()
+        self.kill_at_call = kill_at_call
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def translate(self, text):
+        with self.lock:
+            self.calls.append(text)
+            if self.kill_at_call is not None and len(self.calls) >= self.kill_at_call:
+                raise KeyboardInterrupt
+        return super().translate(text)
+
+
+# Input: baris processed_data.csv (full_text bisa berisi newline), beberapa tweet_clean diulang dan satu kosong
+@pytest.fixture
+def corpus(tmp_path):
+    with open(SOURCE_CSV, newline='', encoding='utf-8') as f:
+        rows = [{'full_text': row['full_text'], 'tweet_clean': row['tweet_clean']} for row in csv.DictReader(f)][:N_ROWS]
+    rows[5]['tweet_clean'] = ''
+    for i in (12, 31, 47):
+        rows[i]['tweet_clean'] = rows[i - 10]['tweet_clean']
+    path = str(tmp_path / 'corpus.csv')
+    pd.DataFrame(rows).to_csv(path, index=False, encoding='utf-8')
+    return path, rows
+
+
+def read_output(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def label_args(tmp_path, output_name='labeled.csv'):
+    return {
+        'output_path': str(tmp_path / output_name),
+        'cache_path': str(tmp_path / 'labeling_cache.db'),
+        'max_workers': 2,
+        'chunk_size': CHUNK_SIZE,
+    }
+
+
+def test_resume_after_kill(corpus, tmp_path):
+    input_path, rows = corpus
+    args = label_args(tmp_path)
+    output_path = args['output_path']
+
+    killed = RecordingTranslator(kill_at_call=KILL_AT_CALL)
+    with pytest.raises(KeyboardInterrupt):
+        label_corpus.label_csv(input_path, translator=killed, **args)
+    done = label_corpus.load_checkpoint(output_path, input_path)
+    assert 0 < done < N_ROWS and done % CHUNK_SIZE == 0
+    assert len(read_output(output_path)) == done
+    # Baris setengah jadi setelah checkpoint terakhir dibuang saat resume
+    with open(output_path, 'a', encoding='utf-8') as f:
+        f.write('"baris terpotong,')
+
+    resumed = RecordingTranslator()
+    total, translated, failed = label_corpus.label_csv(input_path, translator=resumed, **args)
+    assert (total, failed) == (N_ROWS - done, 0)
+    # Teks dari chunk yang sudah selesai diambil dari cache, bukan diterjemahkan ulang
+    cached = {row['tweet_clean'] for row in rows[:done]}
+    expected_calls = {row['tweet_clean'] for row in rows[done:] if row['tweet_clean'].strip()} - cached
+    assert sorted(resumed.calls) == sorted(expected_calls)
+    assert translated == len(expected_calls)
+
+    out = read_output(output_path)
+    assert out['full_text'].tolist() == [row['full_text'] for row in rows]
+    assert out['tweet_clean'].tolist() == out['english_text'].tolist() == [row['tweet_clean'] for row in rows]
+    expected_labels = [label_corpus.get_sentiment(label_corpus.polarity(row['tweet_clean'])) for row in rows]
+    assert out['label'].tolist() == expected_labels
+
+    # Run ulang penuh: semua terjemahan dari cache, hasil sama persis
+    rerun = RecordingTranslator()
+    rerun_args = dict(args, output_path=str(tmp_path / 'labeled_rerun.csv'))
+    assert label_corpus.label_csv(input_path, translator=rerun, **rerun_args) == (N_ROWS, 0, 0)
+    assert rerun.calls == []
+    assert read_output(rerun_args['output_path']).equals(out)
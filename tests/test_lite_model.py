@@ -0,0 +1,47 @@
+import csv
+import os
+import joblib
+import numpy as np
+import pytest
+import inference
+from lite_model import LiteModel, export_model, file_sha256
+from preprocessing import PARITY_CSV
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return joblib.load(inference.MODEL_PATH)
+
+
+@pytest.fixture
+def lite_path(pipeline, tmp_path):
+    return export_model(pipeline, str(tmp_path / 'best_model_lite'), source_path=inference.MODEL_PATH)
+
+
+def dataset_texts():
+    with open(PARITY_CSV, newline='', encoding='utf-8') as f:
+        return [row['tweet_clean'] for row in csv.DictReader(f)]
+
+
+# Probabilitas artefak lite harus identik bit-per-bit dengan pipeline sklearn
+def test_export_matches_pipeline(pipeline, lite_path):
+    texts = dataset_texts()
+    model = LiteModel.load(lite_path, verify_checksum=True)
+    assert np.array_equal(model.predict_proba(texts), pipeline.predict_proba(texts))
+    assert np.array_equal(model.predict(texts), pipeline.predict(texts).astype(str))
+
+
+# Checksum hanya dicek kalau diminta; artefak dari pickle lain jatuh ke pickle
+def test_load_checks(lite_path):
+    with open(os.path.join(lite_path, 'idf.npy'), 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\x01' if last == b'\x00' else b'\x00')
+    LiteModel.load(lite_path)
+    with pytest.raises(ValueError):
+        LiteModel.load(lite_path, verify_checksum=True)
+
+    source_sha256 = file_sha256(inference.MODEL_PATH)
+    assert isinstance(inference.load_model(lite_path=lite_path, source_sha256=source_sha256), LiteModel)
+    assert not isinstance(inference.load_model(lite_path=lite_path, source_sha256='0' * 64), LiteModel)
@@ -0,0 +1,128 @@
+import csv
+import hashlib
+import json
+import os
+import sys
+import pytest
+import preprocessing
+from resources import has_nltk_resource
+
+# Baris dataset yang juga dicek sampai stemming (clean_text), sisanya hanya tokenize
+STEM_SAMPLE_EVERY = 100
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'preprocessing_parity.json')
+
+# Kasus tepi tokenizer satu pass vs re.sub berantai + word_tokenize
+EDGE_CASES = [
+    "",
+    "   \t\n  ",
+    "Halo @user_1 cek https://t.co/abc123 dan www.contoh.com/x?y=1 #AI #IndonesiaMaju",
+    "@userhttps://t.co/x #taghttp://a.b #tag2www.c.d",
+    "email a@b.com, harga Rp50.000 (diskon 10%)!",
+    "AI2024 versi3 gpt4o 12abc abc12 1.5x",
+    "I'm gonna test it, cannot wanna lemme gimme gotta",
+    "gonna_be wanna-be cannot's GONNA Wanna",
+    "İstanbul İYİ ĞÜŞ çok",
+    "emoji 😀🔥 dan kata",
+    "under_score __dunder__ _x_",
+    "baris1\nbaris2\r\nbaris3\ttab",
+    "yang dan di ke ini itu saya kecerdasan buatan",
+    "ÄÖÜ ß ﬁ Straße naïve café",
+    "...!!!???",
+]
+
+
+def _text_id(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def dataset_texts():
+    with open(preprocessing.PARITY_CSV, newline='', encoding='utf-8') as f:
+        return [row['full_text'] for row in csv.DictReader(f)]
+
+
+def stem_sample():
+    return dataset_texts()[::STEM_SAMPLE_EVERY]
+
+
+def load_fixture():
+    with open(FIXTURE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Tulis ulang fixture dari versi lama (re.sub berantai + word_tokenize punkt + stopword NLTK asli), dari root repo:
+# python -m tests.test_preprocessing
+# "dataset": token sebelum stemming untuk semua baris; "edge_cases" dan "stem_sample": juga hasil clean_text lama.
+def write_fixture(path=FIXTURE_PATH):
+    expected = {
+        "dataset": {_text_id(text): preprocessing.reference_tokens(text) for text in dataset_texts()},
+        "edge_cases": [
+            [text, preprocessing.reference_tokens(text), preprocessing.clean_text_reference(text)] for text in EDGE_CASES
+        ],
+        "stem_sample": {_text_id(text): preprocessing.clean_text_reference(text) for text in stem_sample()},
+    }
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(expected, f, ensure_ascii=False, separators=(',', ':'))
+    return len(expected["dataset"]) + len(expected["edge_cases"])
+
+
+def test_tokenize_matches_fixture_dataset():
+    expected = load_fixture()["dataset"]
+    texts = dataset_texts()
+    assert {_text_id(text) for text in texts} == set(expected)
+    mismatches = [text for text in texts if list(preprocessing.tokenize(text)) != expected[_text_id(text)]]
+    assert not mismatches, f"{len(mismatches)} baris beda, contoh: {mismatches[0]!r}"
+
+
+@pytest.mark.parametrize("index", range(len(EDGE_CASES)))
+def test_matches_fixture_edge_cases(index):
+    text, tokens, cleaned = load_fixture()["edge_cases"][index]
+    assert list(preprocessing.tokenize(text)) == tokens
+    assert preprocessing.clean_text(text) == cleaned
+
+
+def test_clean_text_matches_fixture_stem_sample():
+    expected = load_fixture()["stem_sample"]
+    texts = stem_sample()
+    assert {_text_id(text) for text in texts} == set(expected)
+    mismatches = [text for text in texts if preprocessing.clean_text(text) != expected[_text_id(text)]]
+    assert not mismatches, f"{len(mismatches)} baris beda, contoh: {mismatches[0]!r}"
+
+
+def test_tokenize_non_string():
+    assert list(preprocessing.tokenize(None)) == []
+    assert list(preprocessing.tokenize(float('nan'))) == []
+    assert preprocessing.clean_text(None) == ""
+
+
+def test_fixture_covers_edge_cases():
+    assert [case[0] for case in load_fixture()["edge_cases"]] == EDGE_CASES
+
+
+# Paritas langsung dengan versi lama (word_tokenize + stopword NLTK asli) di semua baris,
+# hanya kalau punkt dan stopwords ada di nltk_data mesin ini
+needs_nltk_data = pytest.mark.skipif(
+    not (has_nltk_resource('tokenizers/punkt_tab') or has_nltk_resource('tokenizers/punkt'))
+    or not has_nltk_resource('corpora/stopwords'),
+    reason="punkt/stopwords tidak ada di nltk_data lokal",
+)
+
+
+@needs_nltk_data
+def test_tokenize_matches_word_tokenize():
+    texts = EDGE_CASES + dataset_texts()
+    mismatches = [text for text in texts if list(preprocessing.tokenize(text)) != preprocessing.reference_tokens(text)]
+    assert not mismatches, f"{len(mismatches)} baris beda, contoh: {mismatches[0]!r}"
+
+
+# Stemming semua baris tanpa cache butuh belasan menit: pytest --runslow
+@pytest.mark.slow
+@needs_nltk_data
+def test_clean_text_matches_reference():
+    texts = EDGE_CASES + dataset_texts()
+    mismatches = [text for text in texts if preprocessing.clean_text(text) != preprocessing.clean_text_reference(text)]
+    assert not mismatches, f"{len(mismatches)} baris beda, contoh: {mismatches[0]!r}"
+
+
+if __name__ == "__main__":
+    print(f"{write_fixture()} kasus ditulis ke {FIXTURE_PATH}")
+    sys.exit(0)
@@ -0,0 +1,259 @@
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import time
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.feature_selection import SelectKBest, chi2
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+TRAIN_CSV = os.path.join('Dataset', 'final-preprocessing (best data).csv')
+OUTPUT_PATH = os.path.join('Model', 'best_model_trained.pkl')
+
+# Grid yang sama dengan Modeling V2.ipynb (tfidf -> chi2 -> nb + class_prior)
+PARAM_GRID = {
+    'tfidf__max_features': [1000, 2000, 3000, 4000, 5000],
+    'tfidf__ngram_range': [(1, 1), (1, 2)],
+    'tfidf__max_df': [0.5, 0.75, 0.85, 0.9],
+    'tfidf__min_df': [1, 2, 3, 4, 5],
+    'chi2__k': [500, 1000, 2000, 'all'],
+    'nb__alpha': [0.01, 0.1, 0.5, 1.0, 2.0, 5.0],
+    'nb__class_prior': [
+        [0.6, 0.3, 0.1],
+        [0.5, 0.3, 0.2],
+        [0.4, 0.4, 0.2],
+        [0.3, 0.4, 0.3],
+    ],
+}
+# Grid kecil untuk coba cepat / membandingkan dengan GridSearchCV
+SMALL_GRID = {
+    'tfidf__max_features': [2000, 5000],
+    'tfidf__ngram_range': [(1, 1), (1, 2)],
+    'tfidf__max_df': [0.5, 0.9],
+    'tfidf__min_df': [1, 2],
+    'chi2__k': [1000, 'all'],
+    'nb__alpha': [0.1, 1.0],
+    'nb__class_prior': [[0.4, 0.4, 0.2], [0.3, 0.4, 0.3]],
+}
+PREFIX_KEYS = ('tfidf__ngram_range', 'tfidf__max_df', 'tfidf__min_df', 'tfidf__max_features')
+SUFFIX_KEYS = ('chi2__k', 'nb__alpha', 'nb__class_prior')
+
+
+def load_data(csv_path=TRAIN_CSV, test_size=0.1, random_state=42):
+    df = pd.read_csv(csv_path).dropna(subset=['tweet_clean', 'label'])
+    return train_test_split(df['tweet_clean'].tolist(), df['label'].tolist(), test_size=test_size, random_state=random_state)
+
+
+def build_pipeline(params=None):
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer()),
+        ('chi2', SelectKBest(chi2)),
+        ('nb', MultinomialNB()),
+    ])
+    if params:
+        pipeline.set_params(**params)
+    return pipeline
+
+
+# Kandidat = (prefix tfidf, suffix chi2/nb), dikelompokkan per prefix supaya TF-IDF di-fit sekali
+def expand_grid(grid):
+    prefixes = list(itertools.product(*(grid[key] for key in PREFIX_KEYS)))
+    suffixes = list(itertools.product(*(range(len(grid[key])) for key in SUFFIX_KEYS)))
+    return [(prefix, suffix) for prefix in prefixes for suffix in suffixes]
+
+
+def candidate_params(grid, candidate):
+    prefix, suffix = candidate
+    params = dict(zip(PREFIX_KEYS, prefix))
+    params.update({key: grid[key][index] for key, index in zip(SUFFIX_KEYS, suffix)})
+    return params
+
+
+# Worker: data dan fold diwarisi lewat initializer, hasil CountVectorizer tanpa batas (per fold, ngram_range)
+# di-cache per proses. max_df/min_df/max_features cukup memotong kolom dari hasil itu.
+_data = None
+_counts_cache = {}
+
+
+def _init_worker(texts, labels, folds, grid):
+    global _data
+    _data = (np.asarray(texts, dtype=object), np.asarray(labels), folds, grid)
+    _counts_cache.clear()
+
+
+def _fold_counts(fold, ngram_range):
+    key = (fold, ngram_range)
+    if key not in _counts_cache:
+        texts, _, folds, _ = _data
+        train_index, val_index = folds[fold]
+        vectorizer = CountVectorizer(ngram_range=ngram_range, dtype=np.float64)
+        X_train = vectorizer.fit_transform(texts[train_index])
+        _counts_cache[key] = (X_train, vectorizer.transform(texts[val_index]))
+    return _counts_cache[key]
+
+
+# Sama dengan CountVectorizer._limit_features (dipanggil dengan fitur yang sudah urut)
+def _limit_features(X, max_df, min_df, max_features):
+    n_doc = X.shape[0]
+    high = max_df if isinstance(max_df, int) else max_df * n_doc
+    low = min_df if isinstance(min_df, int) else min_df * n_doc
+    dfs = np.bincount(X.indices, minlength=X.shape[1])
+    mask = (dfs <= high) & (dfs >= low)
+    if max_features is not None and mask.sum() > max_features:
+        tfs = np.asarray(X.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:max_features]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    return np.where(mask)[0]
+
+
+# Matriks TF-IDF + skor chi2 untuk satu fold dan satu prefix
+def _prefix_features(fold, prefix):
+    ngram_range, max_df, min_df, max_features = prefix
+    _, labels, folds, _ = _data
+    train_index, _ = folds[fold]
+    counts_train, counts_val = _fold_counts(fold, ngram_range)
+    kept = _limit_features(counts_train, max_df, min_df, max_features)
+    tfidf = TfidfTransformer()
+    X_train = tfidf.fit_transform(counts_train[:, kept])
+    X_val = tfidf.transform(counts_val[:, kept])
+    # k hanya mengubah mask dari skor yang sama, chi2 dihitung sekali
+    selector = SelectKBest(chi2, k='all').fit(X_train, labels[train_index])
+    return X_train, X_val, selector
+
+
+def _score_prefix(task):
+    fold, prefix, suffixes = task
+    _, labels, folds, grid = _data
+    train_index, val_index = folds[fold]
+    y_train, y_val = labels[train_index], labels[val_index]
+    X_train, X_val, selector = _prefix_features(fold, prefix)
+    scores = []
+    selected = {}
+    for suffix in suffixes:
+        k_index, alpha_index, prior_index = suffix
+        if k_index not in selected:
+            selector.set_params(k=grid['chi2__k'][k_index])
+            support = selector.get_support(indices=True)
+            selected[k_index] = (X_train[:, support], X_val[:, support])
+        Xk_train, Xk_val = selected[k_index]
+        nb = MultinomialNB(alpha=grid['nb__alpha'][alpha_index], class_prior=grid['nb__class_prior'][prior_index])
+        nb.fit(Xk_train, y_train)
+        scores.append(((prefix, suffix), float(np.mean(nb.predict(Xk_val) == y_val))))
+    return scores
+
+
+def _evaluate(pool, candidates, fold):
+    by_prefix = {}
+    for prefix, suffix in candidates:
+        by_prefix.setdefault(prefix, []).append(suffix)
+    tasks = [(fold, prefix, suffixes) for prefix, suffixes in by_prefix.items()]
+    results = pool.imap_unordered(_score_prefix, tasks) if pool is not None else map(_score_prefix, tasks)
+    return [score for scores in results for score in scores]
+
+
+# Successive halving dengan fold CV sebagai resource: semua kandidat dinilai di fold pertama,
+# 1/factor terbaik lanjut ke fold berikutnya, dst. Kandidat yang tersisa di akhir dinilai di semua fold.
+# factor=1 berarti grid penuh (semua kandidat di semua fold), tetap memakai cache.
+def successive_halving(texts, labels, grid=PARAM_GRID, cv=5, factor=3, processes=None):
+    folds = list(StratifiedKFold(n_splits=cv).split(texts, labels))
+    candidates = expand_grid(grid)
+    order = {candidate: i for i, candidate in enumerate(candidates)}
+    scores = {candidate: [] for candidate in candidates}
+    processes = processes or os.cpu_count() or 1
+    pool = None
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(texts, labels, folds, grid))
+    else:
+        _init_worker(texts, labels, folds, grid)
+    try:
+        alive = candidates
+        for fold in range(cv):
+            start = time.perf_counter()
+            for candidate, score in _evaluate(pool, alive, fold):
+                scores[candidate].append(score)
+            print(f"fold {fold + 1}/{cv}: {len(alive)} kandidat, {time.perf_counter() - start:.1f} detik")
+            ranked = sorted(alive, key=lambda c: (-np.mean(scores[c]), order[c]))
+            if fold < cv - 1 and factor > 1:
+                alive = ranked[:max(1, math.ceil(len(alive) / factor))]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    best = ranked[0]
+    return candidate_params(grid, best), float(np.mean(scores[best])), len(candidates)
+
+
+# Pembanding: GridSearchCV biasa (TF-IDF di-fit ulang untuk setiap kombinasi)
+def grid_search(texts, labels, grid=PARAM_GRID, cv=5, processes=None):
+    search = GridSearchCV(build_pipeline(), grid, cv=cv, scoring='accuracy', n_jobs=processes or -1)
+    search.fit(texts, labels)
+    return search.best_params_, float(search.best_score_)
+
+
+# Cek cache: TF-IDF hasil potong kolom harus sama persis dengan TfidfVectorizer yang di-fit langsung
+def check_cache_parity(texts, labels, grid=SMALL_GRID, cv=5):
+    folds = list(StratifiedKFold(n_splits=cv).split(texts, labels))
+    _init_worker(texts, labels, folds, grid)
+    texts = np.asarray(texts, dtype=object)
+    mismatches = 0
+    for fold, (train_index, val_index) in enumerate(folds):
+        for prefix in itertools.product(*(grid[key] for key in PREFIX_KEYS)):
+            X_train, X_val, _ = _prefix_features(fold, prefix)
+            vectorizer = TfidfVectorizer(**{key.split('__')[1]: value for key, value in zip(PREFIX_KEYS, prefix)})
+            expected_train = vectorizer.fit_transform(texts[train_index])
+            expected_val = vectorizer.transform(texts[val_index])
+            if (X_train != expected_train).nnz or (X_val != expected_val).nnz:
+                mismatches += 1
+                print(f"MISMATCH fold {fold} {prefix}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter search tfidf -> chi2 -> MultinomialNB")
+    parser.add_argument('--csv', default=TRAIN_CSV)
+    parser.add_argument('--grid', choices=['full', 'small'], default='full')
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--factor', type=int, default=3, help="successive halving, 1 = grid penuh (tetap pakai cache)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default=OUTPUT_PATH, help="pickle pipeline terbaik (dilatih ulang di seluruh data train)")
+    parser.add_argument('--compare-grid-search', action='store_true', help="jalankan juga GridSearchCV untuk perbandingan waktu")
+    parser.add_argument('--check-cache', action='store_true', help="cek cache TF-IDF identik dengan TfidfVectorizer")
+    args = parser.parse_args()
+
+    grid = PARAM_GRID if args.grid == 'full' else SMALL_GRID
+    X_train, X_test, y_train, y_test = load_data(args.csv)
+
+    if args.check_cache:
+        mismatches = check_cache_parity(X_train, y_train, grid, args.cv)
+        print("Cache identik" if not mismatches else f"{mismatches} prefix berbeda")
+        return
+
+    start = time.perf_counter()
+    best_params, best_score, n_candidates = successive_halving(X_train, y_train, grid, args.cv, args.factor, args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"{n_candidates} kandidat dalam {elapsed:.1f} detik, CV accuracy {best_score:.4f}")
+    print(f"Parameter terbaik: {best_params}")
+
+    if args.compare_grid_search:
+        start = time.perf_counter()
+        grid_params, grid_score = grid_search(X_train, y_train, grid, args.cv, args.processes)
+        grid_elapsed = time.perf_counter() - start
+        print(f"GridSearchCV: {grid_elapsed:.1f} detik ({grid_elapsed / elapsed:.1f}x), CV accuracy {grid_score:.4f}")
+        print(f"Parameter terbaik GridSearchCV: {grid_params}")
+
+    import joblib
+    model = build_pipeline(best_params).fit(X_train, y_train)
+    print(f"Test accuracy: {np.mean(model.predict(X_test) == np.asarray(y_test)):.4f}")
+    joblib.dump(model, args.output)
+    print(f"Model disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()